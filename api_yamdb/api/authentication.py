@@ -0,0 +1,160 @@
+"""Проект спринта 10: JWT-аутентификация без чтения пользователя из БД.
+
+Access-токен из get_jwt_token содержит имя, роль, is_staff и версию
+токенов пользователя. Для проверки разрешений пользователь собирается
+из этих claims; остальные поля модели отложены и читаются из базы при
+первом обращении, поэтому представления, которым нужен весь профиль,
+загружают пользователя сами.
+
+Смена имени, роли, is_staff или is_active увеличивает версию токенов
+пользователя, и токены с прежней версией отклоняются. Текущая версия
+хранится в кэше TOKEN_VERSION_CACHE_ALIAS до TOKEN_VERSION_CACHE_TIMEOUT
+секунд: столько другой процесс может принимать отозванный токен.
+
+Пользователи, которых приходится читать из базы (токены без claims),
+хранятся в LRU-кэше процесса на USER_CACHE_SIZE записей и
+USER_CACHE_TIMEOUT секунд. Запись удаляется при сохранении и удалении
+пользователя; изменения через QuerySet.update кэш не видит.
+"""
+import threading
+from collections import OrderedDict
+from copy import copy
+from time import monotonic
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+from reviews.models import CustomUser
+
+# Поля пользователя, которые записываются в access-токен.
+TOKEN_CLAIMS = ('username', 'role', 'is_staff')
+VERSION_CLAIM = 'token_version'
+VERSION_KEY = 'token-version:{}'
+
+
+def get_access_token(user):
+    token = AccessToken.for_user(user)
+    for claim in TOKEN_CLAIMS:
+        token[claim] = getattr(user, claim)
+    token[VERSION_CLAIM] = user.token_version
+    return token
+
+
+def get_cache():
+    return caches[settings.TOKEN_VERSION_CACHE_ALIAS]
+
+
+def get_token_version(user_id):
+    """Текущая версия токенов пользователя или None, если его нет."""
+    key = VERSION_KEY.format(user_id)
+    version = get_cache().get(key)
+    if version is None:
+        version = CustomUser.objects.filter(pk=user_id).values_list(
+            'token_version', flat=True
+        ).first()
+        if version is not None:
+            get_cache().set(
+                key, version, settings.TOKEN_VERSION_CACHE_TIMEOUT
+            )
+    return version
+
+
+def forget_token_version(user_id):
+    get_cache().delete(VERSION_KEY.format(user_id))
+
+
+class UserCache:
+    """LRU-кэш пользователей по id с ограничением размера и времени жизни."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.users = OrderedDict()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def get(self, user_id):
+        """Копия пользователя из кэша или None."""
+        with self.lock:
+            user, expires = self.users.get(user_id, (None, 0))
+            if user is None or expires <= monotonic():
+                self.users.pop(user_id, None)
+                self.stats['misses'] += 1
+                return None
+            self.users.move_to_end(user_id)
+            self.stats['hits'] += 1
+        # Запрос может менять request.user: кэшированный экземпляр
+        # не отдаётся наружу.
+        return copy(user)
+
+    def set(self, user):
+        with self.lock:
+            self.users[user.pk] = (
+                copy(user), monotonic() + settings.USER_CACHE_TIMEOUT
+            )
+            self.users.move_to_end(user.pk)
+            while len(self.users) > settings.USER_CACHE_SIZE:
+                self.users.popitem(last=False)
+                self.stats['evictions'] += 1
+
+    def delete(self, user_id):
+        with self.lock:
+            self.users.pop(user_id, None)
+
+    def clear(self):
+        with self.lock:
+            self.users.clear()
+            self.stats = dict.fromkeys(self.stats, 0)
+
+    def get_stats(self):
+        with self.lock:
+            hits, misses = self.stats['hits'], self.stats['misses']
+            return {
+                **self.stats,
+                'size': len(self.users),
+                'hit_ratio': hits / (hits + misses) if hits + misses else 0.0,
+            }
+
+
+user_cache = UserCache()
+
+
+def forget_user(user_id):
+    """Сбрасывает кэшированные версию токенов и пользователя."""
+    forget_token_version(user_id)
+    user_cache.delete(user_id)
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication, собирающий пользователя из claims токена."""
+
+    def get_user(self, validated_token):
+        if VERSION_CLAIM not in validated_token:
+            # Токен выдан без claims пользователя: читаем его из базы.
+            return self.get_cached_user(validated_token)
+        user_id = validated_token[api_settings.USER_ID_CLAIM]
+        if get_token_version(user_id) != validated_token[VERSION_CLAIM]:
+            raise AuthenticationFailed(
+                'Токен отозван: данные пользователя изменились.',
+                code='token_revoked',
+            )
+        values = {claim: validated_token[claim] for claim in TOKEN_CLAIMS}
+        values['id'] = user_id
+        # from_db ждёт значения в порядке полей модели.
+        fields = [
+            field.attname for field in CustomUser._meta.concrete_fields
+            if field.attname in values
+        ]
+        return CustomUser.from_db(
+            DEFAULT_DB_ALIAS, fields, [values[field] for field in fields]
+        )
+
+    def get_cached_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        user = user_cache.get(user_id)
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.set(user)
+        return user
@@ -0,0 +1,115 @@
+"""Проект спринта 10: пакетное создание произведений приложения Api."""
+from django.db import transaction
+from reviews.models import Category, Genre, GenreTitle, Title
+from rest_framework import serializers
+
+from .cache import invalidate_tags
+from .serializers import TitleBulkItemSerializer
+
+DOES_NOT_EXIST = serializers.SlugRelatedField.default_error_messages[
+    'does_not_exist'
+]
+DUPLICATE_TITLE = 'Произведение с таким названием и годом уже существует.'
+
+
+def get_slug_map(model, slugs):
+    """Один запрос IN на все slug-и модели из пакета."""
+    return dict(
+        model.objects.filter(slug__in=slugs).values_list('slug', 'id')
+    )
+
+
+def get_title_ids(pairs):
+    """id произведений по парам (название, год) одним запросом."""
+    names, years = zip(*pairs) if pairs else ((), ())
+    return {
+        (name, year): pk
+        for pk, name, year in Title.objects.filter(
+            name__in=set(names), year__in=set(years)
+        ).values_list('id', 'name', 'year')
+        if (name, year) in pairs
+    }
+
+
+def get_reference_errors(data, genre_ids, category_ids):
+    errors = {}
+    missing = [slug for slug in data['genre'] if slug not in genre_ids]
+    if missing:
+        errors['genre'] = [
+            DOES_NOT_EXIST.format(slug_name='slug', value=slug)
+            for slug in missing
+        ]
+    if data['category'] not in category_ids:
+        errors['category'] = [DOES_NOT_EXIST.format(
+            slug_name='slug', value=data['category']
+        )]
+    return errors
+
+
+def save_titles(valid, genre_ids, category_ids):
+    """Вставляет произведения и связи с жанрами в одной транзакции."""
+    with transaction.atomic():
+        titles = Title.objects.bulk_create(
+            Title(
+                name=data['name'],
+                year=data['year'],
+                description=data['description'],
+                category_id=category_ids[data['category']],
+            )
+            for data in valid
+        )
+        # SQLite не возвращает id из bulk_create: находим их по
+        # уникальной паре (название, год).
+        if any(title.pk is None for title in titles):
+            ids = get_title_ids({(title.name, title.year) for title in titles})
+            for title in titles:
+                title.pk = ids[(title.name, title.year)]
+        GenreTitle.objects.bulk_create(
+            GenreTitle(title_id=title.pk, genre_id=genre_ids[slug])
+            for title, data in zip(titles, valid)
+            for slug in dict.fromkeys(data['genre'])
+        )
+        invalidate_tags('title')
+    return titles
+
+
+def bulk_create_titles(items):
+    """Создаёт корректные произведения пакета, для прочих собирает ошибки.
+
+    Возвращает список результатов в порядке входных данных: данные
+    созданного произведения или {'errors': ...} для отклонённого.
+    """
+    results = [None] * len(items)
+    valid = {}
+    for index, item in enumerate(items):
+        serializer = TitleBulkItemSerializer(data=item)
+        if serializer.is_valid():
+            valid[index] = serializer.validated_data
+        else:
+            results[index] = {'errors': serializer.errors}
+
+    genre_ids = get_slug_map(Genre, {
+        slug for data in valid.values() for slug in data['genre']
+    })
+    category_ids = get_slug_map(Category, {
+        data['category'] for data in valid.values()
+    })
+    existing = get_title_ids({
+        (data['name'], data['year']) for data in valid.values()
+    })
+    seen = set()
+    for index, data in list(valid.items()):
+        errors = get_reference_errors(data, genre_ids, category_ids)
+        key = (data['name'], data['year'])
+        if key in existing or key in seen:
+            errors['non_field_errors'] = [DUPLICATE_TITLE]
+        seen.add(key)
+        if errors:
+            results[index] = {'errors': errors}
+            del valid[index]
+
+    if valid:
+        titles = save_titles(list(valid.values()), genre_ids, category_ids)
+        for title, (index, data) in zip(titles, valid.items()):
+            results[index] = {'id': title.pk, **data}
+    return results
@@ -0,0 +1,208 @@
+"""Проект спринта 10: кэш ответов на анонимные GET-запросы приложения Api.
+
+Ключ ответа строится из полного пути с query string и текущих версий
+тегов, от которых зависит эндпоинт. Изменение модели увеличивает версию
+её тегов, после чего все старые ключи перестают находиться и вытесняются
+кэшем по TTL, без перебора записей.
+
+Версии тегов должны быть общими для всех процессов, поэтому кэш в памяти
+процесса допускается только при RESPONSE_CACHE_SINGLE_PROCESS (см.
+api/checks.py).
+"""
+import logging
+from hashlib import sha1
+from time import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+TAG_KEY = 'response-cache:tag:{}'
+TAG_TIME_KEY = 'response-cache:tag-time:{}'
+RESPONSE_KEY = 'response-cache:{path}:{versions}'
+HITS_KEY = 'response-cache:hits'
+MISSES_KEY = 'response-cache:misses'
+
+logger = logging.getLogger(__name__)
+
+
+def get_cache():
+    return caches[settings.RESPONSE_CACHE_ALIAS]
+
+
+def increment(key, delta=1, initial=0):
+    cache = get_cache()
+    cache.add(key, initial, timeout=None)
+    try:
+        return cache.incr(key, delta)
+    except ValueError:
+        cache.set(key, initial + delta, timeout=None)
+        return initial + delta
+
+
+def get_tag_state(tags):
+    """Возвращает строку версий тегов и время их последнего изменения.
+
+    Отсутствующий тег (новый или вытесненный из кэша) начинает отсчёт
+    с текущего времени в миллисекундах, поэтому его версия не совпадёт
+    с выданной клиентам до вытеснения.
+    """
+    cache = get_cache()
+    keys = [(TAG_KEY.format(tag), TAG_TIME_KEY.format(tag)) for tag in tags]
+    values = cache.get_many([key for pair in keys for key in pair])
+    versions, modified = [], []
+    for version_key, time_key in keys:
+        if version_key not in values or time_key not in values:
+            now = time()
+            cache.add(version_key, int(now * 1000), timeout=None)
+            cache.add(time_key, now, timeout=None)
+            values.update(cache.get_many((version_key, time_key)))
+        versions.append(str(values.get(version_key, 0)))
+        modified.append(values.get(time_key, 0))
+    return '.'.join(versions), max(modified, default=None)
+
+
+class TagBatch:
+    """Теги транзакции, сбрасываемые одним обработчиком on_commit."""
+
+    def __init__(self):
+        self.tags = set()
+
+    def __call__(self):
+        now = time()
+        try:
+            for tag in self.tags:
+                increment(TAG_KEY.format(tag), initial=int(now * 1000))
+            get_cache().set_many(
+                {TAG_TIME_KEY.format(tag): now for tag in self.tags},
+                timeout=None,
+            )
+        except Exception:
+            logger.exception('Теги кэша ответов %s не сброшены', self.tags)
+
+
+def invalidate_tags(*tags):
+    """Сбрасывает ответы с тегами tags после фиксации транзакции.
+
+    Если увеличить версию до COMMIT, параллельный запрос успеет положить
+    в кэш старые данные уже под новой версией. Теги одной транзакции
+    собираются в множество: каскадное удаление сотен строк сбрасывает
+    каждый тег один раз. Ошибка кэша только пишется в журнал: данные уже
+    зафиксированы, и исключение из обработчика on_commit выдало бы
+    успешную запись за неудачную.
+    """
+    connection = transaction.get_connection()
+    batch = getattr(connection, 'cache_tag_batch', None)
+    # Обработчик пропадает из run_on_commit после фиксации и при откате
+    # транзакции или точки сохранения, в которой он добавлен.
+    if batch is None or not any(
+        hook[1] is batch for hook in connection.run_on_commit
+    ):
+        batch = connection.cache_tag_batch = TagBatch()
+        batch.tags.update(tags)
+        transaction.on_commit(batch)
+        return
+    batch.tags.update(tags)
+
+
+def get_stats():
+    cache = get_cache()
+    stats = cache.get_many((HITS_KEY, MISSES_KEY))
+    hits, misses = stats.get(HITS_KEY, 0), stats.get(MISSES_KEY, 0)
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': hits / (hits + misses) if hits + misses else 0.0,
+    }
+
+
+class CachedListMixin:
+    """Кэширует ответ list для анонимных GET-запросов.
+
+    Вьюсет перечисляет в cache_tags теги, от которых зависит ответ.
+    Запросы с заголовком Authorization не кэшируются: ответ может
+    зависеть от пользователя, а проверять токен ради кэша незачем.
+    """
+    cache_tags = ()
+
+    def get_cache_tags(self):
+        return self.cache_tags
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            request, super().list, *args, **kwargs
+        )
+
+    def get_cached_response(self, request, build, *args, **kwargs):
+        if (request.method != 'GET'
+                or 'HTTP_AUTHORIZATION' in request.META):
+            return build(request, *args, **kwargs)
+        cache = get_cache()
+        key = RESPONSE_KEY.format(
+            path=sha1(request.get_full_path().encode()).hexdigest(),
+            versions=get_tag_state(self.get_cache_tags())[0],
+        )
+        data = cache.get(key)
+        if data is not None:
+            increment(HITS_KEY)
+            return Response(data, headers={'X-Cache': 'HIT'})
+        increment(MISSES_KEY)
+        response = build(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, settings.RESPONSE_CACHE_TIMEOUT)
+        response['X-Cache'] = 'MISS'
+        return response
+
+
+class CachedListRetrieveMixin(CachedListMixin):
+    """Кэширует ответы list и retrieve для анонимных GET-запросов."""
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            request, super().retrieve, *args, **kwargs
+        )
+
+
+class ConditionalGetMixin:
+    """ETag и Last-Modified для ответов list и retrieve.
+
+    Оба заголовка вычисляются из версий тегов вьюсета, без выполнения
+    запроса к базе и сериализации, поэтому на совпавший If-None-Match
+    или If-Modified-Since ответ 304 отдаётся сразу.
+    """
+    cache_tags = ()
+
+    def get_cache_tags(self):
+        return self.cache_tags
+
+    def list(self, request, *args, **kwargs):
+        return self.get_conditional_response(
+            request, super().list, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_conditional_response(
+            request, super().retrieve, *args, **kwargs
+        )
+
+    def get_conditional_response(self, request, build, *args, **kwargs):
+        versions, modified = get_tag_state(self.get_cache_tags())
+        etag = '"{}"'.format(sha1('|'.join((
+            request.get_full_path(),
+            request.META.get('HTTP_ACCEPT', ''),
+            versions,
+        )).encode()).hexdigest())
+        last_modified = int(modified) if modified else None
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = build(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if last_modified:
+                response['Last-Modified'] = http_date(last_modified)
+        return response
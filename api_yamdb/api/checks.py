@@ -0,0 +1,34 @@
+"""Проект спринта 10: проверки настроек приложения Api.
+
+Версии тегов кэша ответов хранятся в кэше RESPONSE_CACHE_ALIAS без срока
+жизни. Кэш в памяти процесса не видит изменений, сделанных другим
+процессом, и тот отвечает устаревшими данными и 304 до перезапуска,
+поэтому такой кэш допускается только при RESPONSE_CACHE_SINGLE_PROCESS.
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Error, register
+
+
+@register()
+def check_response_cache(app_configs, **kwargs):
+    alias = settings.RESPONSE_CACHE_ALIAS
+    if alias not in settings.CACHES:
+        return [Error(
+            f'Кэш RESPONSE_CACHE_ALIAS = {alias!r} не описан в CACHES.',
+            id='api.E001',
+        )]
+    cache = caches[alias]
+    if (isinstance(cache, LocMemCache)
+            and not settings.RESPONSE_CACHE_SINGLE_PROCESS):
+        return [Error(
+            f'Кэш RESPONSE_CACHE_ALIAS = {alias!r} '
+            f'({type(cache).__name__}) не общий для процессов: версии '
+            'тегов кэша ответов разойдутся между процессами.',
+            hint='Укажите в RESPONSE_CACHE_ALIAS кэш Memcached или Redis '
+                 'либо запускайте один процесс и включите '
+                 'RESPONSE_CACHE_SINGLE_PROCESS.',
+            id='api.E002',
+        )]
+    return []
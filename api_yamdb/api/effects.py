@@ -0,0 +1,128 @@
+"""Проект спринта 10: побочные действия записи отзывов и комментариев."""
+from collections import Counter, defaultdict
+
+from django.db.models import Count
+from reviews.models import Comment, Review, ScoreHistogram, Title
+from reviews.outbox import drain_outbox
+
+from .cache import invalidate_tags
+from .pipeline import Effect, atomic_effect, pipeline
+
+
+class TitleScoresEffect(Effect):
+    """Сдвиг рейтинга и гистограммы оценок произведения.
+
+    Данные — сумма сдвигов: {'score_sum', 'review_count', 'scores'},
+    поэтому несколько записей отзывов складываются в один UPDATE.
+    """
+
+    def merge(self, pending, data):
+        # Counter.update, в отличие от +, сохраняет отрицательные сдвиги.
+        scores = Counter(pending['scores'])
+        scores.update(data['scores'])
+        return {
+            'score_sum': pending['score_sum'] + data['score_sum'],
+            'review_count': pending['review_count'] + data['review_count'],
+            'scores': scores,
+        }
+
+    def run(self, title_id, data):
+        with atomic_effect():
+            Title.objects.apply_review_delta(
+                title_id, data['score_sum'], data['review_count']
+            )
+            ScoreHistogram.objects.apply_score_delta(
+                title_id, dict(data['scores'])
+            )
+            invalidate_tags('title', f'reviews-{title_id}')
+
+
+class ReviewCommentsEffect(Effect):
+    """Сдвиг счётчика комментариев отзыва: {'title_id', 'count'}."""
+
+    def merge(self, pending, data):
+        return {**data, 'count': pending['count'] + data['count']}
+
+    def run(self, review_id, data):
+        with atomic_effect():
+            Review.objects.apply_comment_delta(review_id, data['count'])
+            invalidate_tags(f'reviews-{data["title_id"]}', 'review')
+
+
+class OutboxEffect(Effect):
+    """Отправка писем из очереди: одна на все письма, ждущие в очереди."""
+
+    def run(self, key, data):
+        drain_outbox()
+
+
+title_scores = TitleScoresEffect()
+review_comments = ReviewCommentsEffect()
+outbox = OutboxEffect()
+
+
+def review_scores_changed(title_id, removed=None, added=None):
+    """Ставит в очередь пересчёт агрегатов после изменения оценки отзыва.
+
+    removed и added — прежняя и новая оценка (None, если её нет).
+    """
+    scores = Counter()
+    if added is not None:
+        scores[added] += 1
+    if removed is not None:
+        scores[removed] -= 1
+    pipeline.submit(title_scores, title_id, {
+        'score_sum': (added or 0) - (removed or 0),
+        'review_count': (added is not None) - (removed is not None),
+        'scores': scores,
+    })
+
+
+def review_comments_changed(review, count_delta):
+    """Ставит в очередь сдвиг счётчика комментариев отзыва."""
+    pipeline.submit(review_comments, review.id, {
+        'title_id': review.title_id, 'count': count_delta,
+    })
+
+
+def user_deleted(user):
+    """Вычитает из агрегатов отзывы и комментарии удаляемого пользователя.
+
+    Они удаляются каскадно, мимо вьюсетов. Сдвиги собираются двумя
+    запросами и группируются по произведению и по отзыву; комментарии к
+    собственным отзывам пользователя не учитываются — эти отзывы тоже
+    удаляются.
+    """
+    removed = defaultdict(Counter)
+    for title_id, score in Review.objects.filter(
+        author_id=user.pk
+    ).values_list('title_id', 'score'):
+        removed[title_id][score] += 1
+    for title_id, scores in removed.items():
+        pipeline.submit(title_scores, title_id, {
+            'score_sum': -sum(
+                score * count for score, count in scores.items()
+            ),
+            'review_count': -sum(scores.values()),
+            'scores': Counter({
+                score: -count for score, count in scores.items()
+            }),
+        })
+    comments = Comment.objects.filter(author_id=user.pk).exclude(
+        review__author_id=user.pk
+    ).order_by().values('review_id', 'review__title_id').annotate(
+        count=Count('id')
+    )
+    for row in comments:
+        pipeline.submit(review_comments, row['review_id'], {
+            'title_id': row['review__title_id'], 'count': -row['count'],
+        })
+
+
+def email_enqueued():
+    """Ставит в очередь отправку писем после фиксации транзакции.
+
+    Письма, не отправленные из-за остановки процесса или ошибки,
+    отправит команда send_outbox.
+    """
+    pipeline.submit(outbox, 'outbox', None)
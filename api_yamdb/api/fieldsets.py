@@ -0,0 +1,39 @@
+"""Проект спринта 10: выборочные поля ответа (?fields= и ?omit=)."""
+FIELDS_PARAM = 'fields'
+OMIT_PARAM = 'omit'
+
+
+def parse_names(value):
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+def get_sparse_fields(request, fields):
+    """Возвращает поля из fields, запрошенные ?fields= и не исключённые ?omit=.
+
+    Порядок полей сохраняется, неизвестные имена игнорируются. Если ни
+    один параметр не передан или запрос не на чтение, возвращается None.
+    """
+    if request is None or request.method != 'GET':
+        return None
+    params = request.query_params
+    if FIELDS_PARAM not in params and OMIT_PARAM not in params:
+        return None
+    selected = fields
+    if params.get(FIELDS_PARAM):
+        requested = parse_names(params[FIELDS_PARAM])
+        selected = [name for name in selected if name in requested]
+    omitted = parse_names(params.get(OMIT_PARAM, ''))
+    return tuple(name for name in selected if name not in omitted)
+
+
+class SparseFieldsetMixin:
+    """Оставляет в сериализаторе только поля, выбранные в запросе."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields = get_sparse_fields(
+            self.context.get('request'), tuple(self.fields)
+        )
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
@@ -1,13 +1,59 @@
+from django import forms
 from django_filters import CharFilter, FilterSet, NumberFilter
+from rest_framework import filters
 from reviews.models import Title
 
 
+class YearFilter(NumberFilter):
+    """Фильтр по году: целое в диапазоне IntegerField, иначе ответ 400.
+
+    Число вне диапазона база не принимает в запрос.
+    """
+    field_class = forms.IntegerField
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('min_value', -2 ** 31)
+        kwargs.setdefault('max_value', 2 ** 31 - 1)
+        super().__init__(*args, **kwargs)
+
+
 class TitleFilter(FilterSet):
     genre = CharFilter(field_name='genre__slug', lookup_expr='iexact', )
     category = CharFilter(field_name='category__slug', lookup_expr='iexact', )
-    name = CharFilter(field_name='name', lookup_expr='icontains')
-    year = NumberFilter(field_name='year', lookup_expr='icontains')
+    name = CharFilter(method='filter_name')
+    year = YearFilter(field_name='year', lookup_expr='exact')
+    year_min = YearFilter(field_name='year', lookup_expr='gte')
+    year_max = YearFilter(field_name='year', lookup_expr='lte')
+    decade = YearFilter(method='filter_decade')
+    # Прежний поиск подстроки в годе: не использует индекс, только по запросу.
+    year_contains = CharFilter(field_name='year', lookup_expr='contains')
 
     class Meta:
         model = Title
-        fields = ['genre', 'category', 'name', 'year']
+        fields = ['genre', 'category', 'name', 'year', 'year_min', 'year_max',
+                  'decade', 'year_contains']
+
+    def filter_name(self, queryset, name, value):
+        return queryset.filter_full_text(value, columns=(name,))
+
+    def filter_decade(self, queryset, name, value):
+        start = value // 10 * 10
+        return queryset.filter(year__gte=start, year__lt=start + 10)
+
+
+class TitleSearchFilter(filters.SearchFilter):
+    """Полнотекстовый поиск ?search= по названию и описанию произведения.
+
+    Без явного ?ordering= результаты упорядочены по релевантности.
+    Стоит после OrderingFilter, чтобы сортировка по релевантности
+    не перекрывалась сортировкой по умолчанию.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+        queryset = queryset.search(' '.join(terms))
+        if filters.OrderingFilter.ordering_param not in request.query_params:
+            queryset = queryset.order_by('search_rank', 'id')
+        return queryset
@@ -0,0 +1,40 @@
+"""Проект спринта 10: встраивание связанных объектов (?include=)."""
+from django.conf import settings
+from rest_framework.exceptions import ValidationError
+
+from .fieldsets import parse_names
+
+INCLUDE_PARAM = 'include'
+LIMIT_PARAM = '{}_limit'
+
+
+def get_limit_param(request, param, default, maximum):
+    """Целое из параметра запроса param в диапазоне от 1 до maximum."""
+    value = request.query_params.get(param, default)
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        limit = 0
+    if not 1 <= limit <= maximum:
+        raise ValidationError(
+            {param: [f'Ожидается число от 1 до {maximum}.']}
+        )
+    return limit
+
+
+def get_includes(request, names):
+    """Возвращает {связь: лимит} для связей из ?include=, допустимых в names.
+
+    Лимит связи задаётся параметром ?<связь>_limit=. Неизвестные имена
+    игнорируются, для запросов не на чтение встраивания нет.
+    """
+    if request is None or request.method != 'GET':
+        return {}
+    requested = parse_names(request.query_params.get(INCLUDE_PARAM, ''))
+    return {
+        name: get_limit_param(
+            request, LIMIT_PARAM.format(name),
+            settings.INCLUDE_LIMIT, settings.MAX_INCLUDE_LIMIT
+        )
+        for name in names if name in requested
+    }
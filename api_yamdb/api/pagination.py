@@ -0,0 +1,294 @@
+"""Проект спринта 10: модуль пагинации приложения Api."""
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+from datetime import datetime
+
+from django.core import exceptions
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.filters import OrderingFilter, SearchFilter
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def encode_value(value):
+    # Дата и время сохраняются в курсоре с микросекундами: DjangoJSONEncoder
+    # обрезает их до миллисекунд, и строки с одной миллисекундой терялись бы.
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f'{type(value).__name__} не сериализуется в курсор.')
+
+
+class KeysetPagination(PageNumberPagination):
+    """Пагинация по ключу с откатом на постраничную.
+
+    Клиент включает режим ключа параметром ?cursor= (пустое значение —
+    первая страница). Страница выбирается условием WHERE по значениям
+    полей сортировки последней выданной строки и id, без COUNT(*)
+    и OFFSET, поэтому глубокие страницы стоят столько же, сколько первая.
+    Запросы с ?page= и без cursor обслуживаются как раньше.
+    """
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Неверный курсор.'
+    # Поля, по которым допустима сортировка в режиме ключа.
+    ordering_fields = ()
+    default_ordering = ()
+    tiebreak_field = 'id'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.cursor_query_param not in request.query_params:
+            self.keyset_mode = False
+            return super().paginate_queryset(queryset, request, view)
+        self.init_keyset_mode(request, queryset)
+        self.ordering = self.get_keyset_ordering(request, queryset, view)
+        position, reverse = self.decode_cursor(
+            request.query_params.get(self.cursor_query_param)
+        )
+        return self.get_keyset_page(queryset, position, reverse)
+
+    def init_keyset_mode(self, request, queryset):
+        self.keyset_mode = True
+        self.display_page_controls = False
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.model = queryset.model
+
+    def get_keyset_page(self, queryset, position, reverse):
+        """Строки страницы после position в порядке self.ordering."""
+        order = self.ordering if not reverse else [
+            (field, not descending) for field, descending in self.ordering
+        ]
+        queryset = queryset.order_by(*(
+            self.get_order_expression(field, descending)
+            for field, descending in order
+        ))
+        if position is not None:
+            queryset = queryset.filter(self.get_after_q(order, position))
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+        self.keyset_results = results
+
+        self.next_position = self.previous_position = None
+        if results and (has_more or reverse):
+            self.next_position = self.get_position(results[-1])
+        if results and (position is not None) and (has_more or not reverse):
+            self.previous_position = self.get_position(results[0])
+        return results
+
+    def get_paginated_response(self, data):
+        if not self.keyset_mode:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ('next', self.get_keyset_link(self.next_position, False)),
+            ('previous', self.get_keyset_link(self.previous_position, True)),
+            ('results', data),
+        ]))
+
+    def get_keyset_ordering(self, request, queryset, view):
+        """Возвращает [(поле, по убыванию), ...] с id в конце.
+
+        Без допустимых полей в ?ordering= действует сортировка по умолчанию.
+        """
+        ordering = [
+            term for term in
+            OrderingFilter().get_ordering(request, queryset, view) or ()
+            if term.lstrip('-') in self.ordering_fields
+        ] or self.default_ordering
+        terms = [(term.lstrip('-'), term.startswith('-')) for term in ordering]
+        if self.tiebreak_field not in dict(terms):
+            terms.append((self.tiebreak_field, False))
+        return terms
+
+    def get_column(self, field):
+        return self.model._meta.get_field(field).attname
+
+    def is_nullable(self, field):
+        return self.model._meta.get_field(field).null
+
+    def get_order_expression(self, field, descending):
+        # NULL считается наименьшим значением на любой СУБД.
+        column = F(self.get_column(field))
+        if not self.is_nullable(field):
+            return column.desc() if descending else column.asc()
+        if descending:
+            return column.desc(nulls_last=True)
+        return column.asc(nulls_first=True)
+
+    def get_after_q(self, order, position):
+        """Условие «строка идёт после position» для заданной сортировки."""
+        condition = Q(pk__in=[])
+        equal = Q()
+        for (field, descending), value in zip(order, position):
+            column = self.get_column(field)
+            if value is None:
+                after = Q(pk__in=[]) if descending else Q(
+                    **{f'{column}__isnull': False}
+                )
+                same = Q(**{f'{column}__isnull': True})
+            else:
+                lookup = 'lt' if descending else 'gt'
+                after = Q(**{f'{column}__{lookup}': value})
+                if descending and self.is_nullable(field):
+                    after |= Q(**{f'{column}__isnull': True})
+                same = Q(**{column: value})
+            condition |= equal & after
+            equal &= same
+        return condition
+
+    def get_position(self, instance):
+        # Строка страницы может быть экземпляром модели или dict из values().
+        get_value = dict.get if isinstance(instance, dict) else getattr
+        return [
+            get_value(instance, self.get_column(field))
+            for field, _ in self.ordering
+        ]
+
+    def decode_cursor(self, encoded):
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(urlsafe_b64decode(encoded.encode('ascii')))
+            ordering = [
+                (field, bool(descending))
+                for field, descending in payload['o']
+            ]
+            position = list(payload['p'])
+            reverse = bool(payload.get('r'))
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        if ordering != self.ordering or len(position) != len(ordering):
+            raise NotFound(self.invalid_cursor_message)
+        try:
+            position = [
+                self.to_python(field, value)
+                for (field, _), value in zip(ordering, position)
+            ]
+        except (TypeError, ValueError, exceptions.ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def to_python(self, field, value):
+        """Значение курсора в типе поля модели.
+
+        Целые вне 64-битного диапазона отклоняются: драйвер СУБД не
+        передаёт их в запрос.
+        """
+        if value is None:
+            return None
+        model_field = self.model._meta.get_field(field)
+        if model_field.is_relation:
+            model_field = model_field.target_field
+        value = model_field.to_python(value)
+        if isinstance(value, int) and not -2 ** 63 <= value < 2 ** 63:
+            raise ValueError(value)
+        return value
+
+    def encode_cursor(self, position, reverse, ordering=None):
+        payload = {
+            'o': self.ordering if ordering is None else ordering,
+            'p': position,
+        }
+        if reverse:
+            payload['r'] = 1
+        return urlsafe_b64encode(json.dumps(
+            payload, separators=(',', ':'), default=encode_value
+        ).encode()).decode('ascii')
+
+    def get_keyset_link(self, position, reverse):
+        if position is None:
+            return None
+        url = remove_query_param(self.base_url, self.page_query_param)
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(position, reverse)
+        )
+
+
+class TitlePagination(KeysetPagination):
+    """Пагинация произведений: постраничная или по ключу (?cursor=).
+
+    Порядок по релевантности ?search= не сохраняется в курсоре, поэтому
+    поиск без ?ordering= в режиме ключа отклоняется ответом 400.
+    """
+    ordering_fields = ('name', 'year', 'rating', 'category')
+    default_ordering = ('id',)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if (self.cursor_query_param in params
+                and params.get(SearchFilter.search_param, '').strip()
+                and OrderingFilter.ordering_param not in params):
+            raise ValidationError({SearchFilter.search_param: [
+                'Результаты поиска по релевантности выдаются только '
+                'постранично (?page=) или с явной сортировкой ?ordering=.'
+            ]})
+        return super().paginate_queryset(queryset, request, view)
+
+
+class ThreadPagination(KeysetPagination):
+    """Пагинация отзывов и комментариев: постраничная, по ключу и лента.
+
+    Порядок по умолчанию (-pub_date, -id) совпадает с составными индексами
+    моделей. Параметр ?since=<курсор> включает ленту: в ответе только
+    записи новее позиции курсора, от старых к новым, а ссылка `next`
+    несёт курсор для следующего опроса. Курсор ленты выдаётся в ссылке
+    `since` первой страницы режима ?cursor=. Опрос читает по индексу
+    только новые строки, поэтому стоит пропорционально новому, а не
+    длине обсуждения.
+    """
+    since_query_param = 'since'
+    ordering_fields = ('pub_date', 'id')
+    default_ordering = ('-pub_date', '-id')
+    since_ordering = [('pub_date', False), ('id', False)]
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.since_mode = self.since_query_param in request.query_params
+        if not self.since_mode:
+            return super().paginate_queryset(queryset, request, view)
+        self.init_keyset_mode(request, queryset)
+        self.ordering = self.since_ordering
+        position, reverse = self.decode_cursor(
+            request.query_params.get(self.since_query_param)
+        )
+        if reverse:
+            raise NotFound(self.invalid_cursor_message)
+        results = self.get_keyset_page(queryset, position, False)
+        self.since_position = (
+            self.get_position(results[-1]) if results else position
+        )
+        return results
+
+    def get_paginated_response(self, data):
+        if self.since_mode:
+            return Response(OrderedDict([
+                ('next', self.get_since_link(self.since_position)),
+                ('results', data),
+            ]))
+        response = super().get_paginated_response(data)
+        if self.keyset_mode:
+            response.data['since'] = None
+            if self.is_newest_page():
+                results = self.keyset_results
+                response.data['since'] = self.get_since_link(
+                    self.get_position(results[0]) if results else None
+                )
+        return response
+
+    def is_newest_page(self):
+        # Самая новая запись известна только на первой странице обхода
+        # от новых к старым.
+        newest_first = [(field, True) for field, _ in self.since_ordering]
+        return self.ordering == newest_first and not self.previous_position
+
+    def get_since_link(self, position):
+        url = remove_query_param(self.base_url, self.cursor_query_param)
+        url = remove_query_param(url, self.page_query_param)
+        encoded = '' if position is None else self.encode_cursor(
+            position, False, self.since_ordering
+        )
+        return replace_query_param(url, self.since_query_param, encoded)
@@ -0,0 +1,145 @@
+"""Проект спринта 10: конвейер побочных действий записи приложения Api.
+
+Производные данные (агрегаты, счётчики, сброс кэша) обновляются не в
+запросе, а после фиксации транзакции в пуле фоновых потоков. Действия
+с одним ключом, ещё ждущие в очереди, объединяются в одно: десять
+отзывов к произведению подряд дают одно обновление его агрегатов.
+
+Очередь ограничена: если она заполнена, действие выполняется сразу в
+вызывающем потоке. Действие, транзакция которого откатилась из-за
+ошибки базы (например, блокировки таблицы), повторяется один раз через
+SIDE_EFFECTS_RETRY_DELAY секунд. Прочие ошибки могут случиться и после
+COMMIT, поэтому такие действия не повторяются: иначе сдвиг агрегатов
+применился бы дважды. Действия, упавшие окончательно или не выполненные
+из-за остановки процесса, восстанавливаются командами пересчёта агрегатов.
+"""
+import logging
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import OperationalError, close_old_connections, transaction
+
+logger = logging.getLogger(__name__)
+
+
+class RetryEffect(Exception):
+    """Транзакция действия откатилась, действие можно повторить."""
+
+
+@contextmanager
+def atomic_effect():
+    """Транзакция действия; ошибка базы в ней откатывает данные целиком."""
+    try:
+        with transaction.atomic():
+            yield
+    except OperationalError as error:
+        raise RetryEffect from error
+
+
+class Effect:
+    """Побочное действие записи с данными, объединяемыми по ключу."""
+
+    def merge(self, pending, data):
+        """Объединяет данные ждущего действия с данными нового."""
+        return data
+
+    def run(self, key, data):
+        raise NotImplementedError
+
+
+class SideEffectPipeline:
+    """Очередь побочных действий с пулом потоков и объединением по ключу."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = {}
+        self.queue = None
+        self.workers = []
+        self.stats = {'submitted': 0, 'coalesced': 0, 'inline': 0, 'failed': 0}
+
+    def submit(self, effect, key, data):
+        """Планирует действие на момент фиксации текущей транзакции."""
+        transaction.on_commit(lambda: self.dispatch(effect, key, data))
+
+    def dispatch(self, effect, key, data):
+        if settings.SIDE_EFFECTS_SYNC:
+            effect.run(key, data)
+            return
+        job = (effect, key)
+        with self.lock:
+            self.stats['submitted'] += 1
+            if job in self.pending:
+                self.pending[job] = effect.merge(self.pending[job], data)
+                self.stats['coalesced'] += 1
+                return
+            self.pending[job] = data
+            self.start()
+        try:
+            self.queue.put_nowait(job)
+        except queue.Full:
+            with self.lock:
+                self.stats['inline'] += 1
+            self.run_job(job)
+
+    def start(self):
+        # Вызывается под self.lock.
+        if self.workers:
+            return
+        self.queue = queue.Queue(maxsize=settings.SIDE_EFFECTS_QUEUE_SIZE)
+        for number in range(settings.SIDE_EFFECTS_WORKERS):
+            worker = threading.Thread(
+                target=self.work, name=f'side-effects-{number}', daemon=True
+            )
+            worker.start()
+            self.workers.append(worker)
+
+    def work(self):
+        while True:
+            job = self.queue.get()
+            try:
+                self.run_job(job)
+            finally:
+                # У каждого потока своё соединение с базой.
+                close_old_connections()
+                self.queue.task_done()
+
+    def run_job(self, job):
+        with self.lock:
+            data = self.pending.pop(job)
+        effect, key = job
+        try:
+            effect.run(key, data)
+            return
+        except RetryEffect:
+            logger.warning(
+                'Побочное действие %s для %s не выполнено, повтор',
+                type(effect).__name__, key, exc_info=True
+            )
+        except Exception:
+            self.fail(effect, key)
+            return
+        time.sleep(settings.SIDE_EFFECTS_RETRY_DELAY)
+        try:
+            effect.run(key, data)
+        except Exception:
+            self.fail(effect, key)
+
+    def fail(self, effect, key):
+        # Вызывается в блоке except: в журнал попадает текущее исключение.
+        with self.lock:
+            self.stats['failed'] += 1
+        logger.exception(
+            'Побочное действие %s для %s не выполнено',
+            type(effect).__name__, key
+        )
+
+    def flush(self):
+        """Ждёт выполнения всех действий, поставленных в очередь."""
+        if self.queue is not None:
+            self.queue.join()
+
+
+pipeline = SideEffectPipeline()
@@ -0,0 +1,149 @@
+"""Проект спринта 10: списки без сериализаторов приложения Api.
+
+Проекция читает строки через values() и собирает из них словари в том
+же виде, что и сериализатор, не создавая экземпляров моделей и полей DRF.
+Совпадение результата с сериализатором проверяется тестом.
+"""
+from collections import defaultdict
+
+from reviews.models import Genre, GenreTitle, Review
+from rest_framework.response import Response
+
+from .fieldsets import get_sparse_fields
+from .includes import get_includes
+from .querysets import optimize_for_serializer
+from .serializers import ReviewSerializer
+
+
+def get_title_reviews(title_ids, limit):
+    """Первые limit отзывов каждого произведения в формате ReviewSerializer.
+
+    Отзывы всех произведений читаются одним запросом: оконная функция
+    ограничивает каждое произведение, автор присоединяется JOIN-ом.
+    """
+    reviews = list(optimize_for_serializer(
+        Review.objects.filter(title_id__in=title_ids).first_per(
+            'title', limit
+        ),
+        ReviewSerializer,
+    ))
+    data = ReviewSerializer(reviews, many=True).data
+    grouped = defaultdict(list)
+    for review, item in zip(reviews, data):
+        grouped[review.title_id].append(item)
+    return grouped
+
+
+class TitleProjection:
+    """Проекция списка произведений в формате TitleGetSerializer.
+
+    Скалярные колонки выбираются всегда: они дешёвые и нужны пагинации
+    по ключу. Описание, категория и жанры читаются, только если
+    соответствующие поля запрошены.
+    """
+    fields = ('id', 'name', 'year', 'rating', 'description', 'genre',
+              'category')
+    values = ('id', 'name', 'year', 'rating', 'category_id')
+    # Связи для ?include=: загрузчик {id произведения: [объекты]}.
+    includes = {'reviews': get_title_reviews}
+    field_values = {
+        'description': ('description',),
+        'category': ('category__name', 'category__slug'),
+    }
+
+    @classmethod
+    def get_queryset(cls, queryset, fields=None):
+        fields = cls.fields if fields is None else fields
+        values = list(cls.values)
+        for field in fields:
+            values.extend(cls.field_values.get(field, ()))
+        return queryset.select_related(None).prefetch_related(None).values(
+            *values
+        )
+
+    @classmethod
+    def get_genres(cls, rows):
+        genres = defaultdict(list)
+        links = GenreTitle.objects.filter(
+            title_id__in=[row['id'] for row in rows]
+        ).order_by(
+            *(f'genre__{field}' for field in Genre.LIST_ORDERING)
+        ).values_list('title_id', 'genre__name', 'genre__slug')
+        for title_id, name, slug in links:
+            genres[title_id].append({'name': name, 'slug': slug})
+        return genres
+
+    @classmethod
+    def get_included(cls, title_ids, includes):
+        return {
+            name: cls.includes[name](title_ids, limit)
+            for name, limit in includes.items()
+        }
+
+    @classmethod
+    def project(cls, rows, fields=None, includes=None):
+        fields = cls.fields if fields is None else fields
+        included = cls.get_included(
+            [row['id'] for row in rows], includes or {}
+        )
+        genres = cls.get_genres(rows) if 'genre' in fields else {}
+        getters = {
+            'id': lambda row: row['id'],
+            'name': lambda row: row['name'],
+            'year': lambda row: row['year'],
+            'rating': lambda row: (
+                None if row['rating'] is None else int(row['rating'])
+            ),
+            'description': lambda row: row['description'],
+            'genre': lambda row: genres[row['id']],
+            'category': lambda row: None if row['category_id'] is None else {
+                'name': row['category__name'],
+                'slug': row['category__slug'],
+            },
+        }
+        getters = [(field, getters[field]) for field in fields]
+        getters += [
+            (name, lambda row, related=related: related[row['id']])
+            for name, related in included.items()
+        ]
+        return [
+            {field: get_value(row) for field, get_value in getters}
+            for row in rows
+        ]
+
+
+class ProjectedListMixin:
+    """Отдаёт list через projection_class вместо сериализатора.
+
+    Связи из ?include= встраиваются и в list, и в retrieve.
+    """
+    projection_class = None
+
+    def get_includes(self):
+        return get_includes(self.request, self.projection_class.includes)
+
+    def list(self, request, *args, **kwargs):
+        fields = get_sparse_fields(request, self.projection_class.fields)
+        includes = self.get_includes()
+        queryset = self.projection_class.get_queryset(
+            self.filter_queryset(self.get_queryset()), fields
+        )
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            return Response(self.projection_class.project(
+                list(queryset), fields, includes
+            ))
+        return self.get_paginated_response(
+            self.projection_class.project(page, fields, includes)
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        includes = self.get_includes()
+        response = super().retrieve(request, *args, **kwargs)
+        if includes:
+            pk = int(self.kwargs[self.lookup_url_kwarg or self.lookup_field])
+            for name, related in self.projection_class.get_included(
+                [pk], includes
+            ).items():
+                response.data[name] = related[pk]
+        return response
@@ -0,0 +1,77 @@
+"""Проект спринта 10: подготовка querysets под сериализаторы приложения Api."""
+from functools import lru_cache
+
+from django.db import models
+from rest_framework import serializers
+
+
+@lru_cache(maxsize=None)
+def get_query_plan(serializer_class, fields=None):
+    """Возвращает (select_related, prefetch_related, defer) для сериализатора.
+
+    Вложенные сериализаторы и связанные поля с одиночным значением
+    присоединяются JOIN-ом, поля с many=True подгружаются prefetch-ем;
+    вложенные списки сортируются по LIST_ORDERING модели.
+    Для SlugRelatedField из присоединённой таблицы читаются только
+    первичный ключ и slug_field. Если задан набор fields, остальные связи
+    не загружаются, а текстовые колонки модели вне набора откладываются.
+    """
+    model = serializer_class.Meta.model
+    select, prefetch, sources, defer = [], [], set(), []
+    for name, field in serializer_class().fields.items():
+        if fields is not None and name not in fields:
+            continue
+        sources.add(field.source)
+        if field.source == '*' or '.' in field.source:
+            continue
+        if isinstance(field, serializers.ListSerializer):
+            prefetch.append(get_list_prefetch(field))
+        elif isinstance(field, serializers.ManyRelatedField):
+            prefetch.append(field.source)
+        elif isinstance(field, (serializers.BaseSerializer,
+                                serializers.RelatedField)):
+            select.append(field.source)
+            if isinstance(field, serializers.SlugRelatedField):
+                defer.extend(get_slug_defer(model, field))
+    if fields is not None:
+        defer.extend(
+            field.name
+            for field in model._meta.concrete_fields
+            if isinstance(field, models.TextField)
+            and field.name not in sources
+        )
+    return tuple(select), tuple(prefetch), tuple(defer)
+
+
+def get_list_prefetch(field):
+    """Prefetch вложенного списка в порядке LIST_ORDERING его модели."""
+    model = getattr(getattr(field.child, 'Meta', None), 'model', None)
+    ordering = getattr(model, 'LIST_ORDERING', None)
+    if not ordering:
+        return field.source
+    return models.Prefetch(
+        field.source, queryset=model.objects.order_by(*ordering)
+    )
+
+
+def get_slug_defer(model, field):
+    """Колонки связанной модели, не нужные SlugRelatedField."""
+    related = model._meta.get_field(field.source).related_model
+    return [
+        f'{field.source}__{related_field.name}'
+        for related_field in related._meta.concrete_fields
+        if not related_field.primary_key
+        and related_field.name != field.slug_field
+    ]
+
+
+def optimize_for_serializer(queryset, serializer_class, fields=None):
+    """Добавляет к queryset JOIN-ы, prefetch и defer под поля сериализатора."""
+    select, prefetch, defer = get_query_plan(serializer_class, fields)
+    if select:
+        queryset = queryset.select_related(*select)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    if defer:
+        queryset = queryset.defer(*defer)
+    return queryset
@@ -0,0 +1,41 @@
+"""Проект спринта 10: объекты вложенных маршрутов приложения Api."""
+from django.shortcuts import get_object_or_404
+from reviews.models import Review, Title
+
+
+class NestedRouteMixin:
+    """Объекты маршрута titles/{title_id}/reviews/{review_id}/.
+
+    Отзыв читается вместе с произведением одним запросом с JOIN, условие
+    которого заодно проверяет, что отзыв относится к произведению из URL.
+    Результат запоминается на запросе, поэтому get_queryset,
+    perform_create и прочие обращения не повторяют поиск.
+    """
+
+    def get_route_objects(self):
+        objects = getattr(self.request, 'route_objects', None)
+        if objects is None:
+            objects = self.request.route_objects = self.resolve_route()
+        return objects
+
+    def resolve_route(self):
+        title_id = self.kwargs.get('title_id')
+        review_id = self.kwargs.get('review_id')
+        if review_id is None:
+            return {'title': get_object_or_404(
+                Title.objects.only('id'), id=title_id
+            )}
+        review = get_object_or_404(
+            Review.objects.select_related('title').only(
+                'id', 'title', 'title__id'
+            ),
+            id=review_id,
+            title_id=title_id,
+        )
+        return {'title': review.title, 'review': review}
+
+    def get_title(self):
+        return self.get_route_objects()['title']
+
+    def get_review(self):
+        return self.get_route_objects()['review']
@@ -1,11 +1,35 @@
 """Проект спринта 10: модуль сериалайзер приложения Api."""
 from django.conf import settings
-from django.shortcuts import get_object_or_404
 from rest_framework import serializers
-from rest_framework.validators import UniqueTogetherValidator, ValidationError
+from rest_framework.utils import model_meta
+from rest_framework.validators import UniqueTogetherValidator
 from reviews.models import Category, Comment, CustomUser, Genre, Review, Title
 from reviews.validators import model_validate_username, model_validate_year
 
+from .fieldsets import SparseFieldsetMixin
+
+
+class ChangedFieldsUpdateMixin:
+    """Обновление, сохраняющее только поля, переданные в запросе.
+
+    Денормализованные счётчики модели меняются отдельными UPDATE в
+    обработчиках записи связанных объектов. Полный save() перезаписал бы
+    их значениями, прочитанными до параллельного изменения.
+    """
+
+    def update(self, instance, validated_data):
+        relations = model_meta.get_field_info(instance).relations
+        many_to_many = {
+            name: validated_data.pop(name) for name in list(validated_data)
+            if name in relations and relations[name].to_many
+        }
+        for name, value in validated_data.items():
+            setattr(instance, name, value)
+        instance.save(update_fields=list(validated_data))
+        for name, value in many_to_many.items():
+            getattr(instance, name).set(value)
+        return instance
+
 
 class CategorySerializer(serializers.ModelSerializer):
     """Класс-сериализатор для Category."""
@@ -23,7 +47,7 @@ class GenreSerializer(serializers.ModelSerializer):
         fields = ("name", "slug")
 
 
-class TitleGetSerializer(serializers.ModelSerializer):
+class TitleGetSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Класс-сериализатор для Titles."""
     genre = GenreSerializer(
         many=True
@@ -38,7 +62,8 @@ class TitleGetSerializer(serializers.ModelSerializer):
         read_only_fields = fields
 
 
-class TitleSerializer(serializers.ModelSerializer):
+class TitleSerializer(ChangedFieldsUpdateMixin,
+                      serializers.ModelSerializer):
     """Класс-сериализатор для Titles."""
     genre = serializers.SlugRelatedField(
         queryset=Genre.objects.all(),
@@ -64,7 +89,25 @@ class TitleSerializer(serializers.ModelSerializer):
         )
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class TitleBulkItemSerializer(serializers.Serializer):
+    """Класс-сериализатор элемента пакетного создания Titles.
+
+    Slug-и жанров и категории проверяются пакетно, одним запросом на
+    весь пакет, поэтому здесь они принимаются как строки.
+    """
+    name = serializers.CharField(max_length=settings.MAX_LENGTH_NAME)
+    year = serializers.IntegerField(validators=[model_validate_year, ])
+    description = serializers.CharField(
+        required=False, allow_blank=True, default=''
+    )
+    genre = serializers.ListField(
+        child=serializers.SlugField(max_length=settings.MAX_LENGTH_SLUG)
+    )
+    category = serializers.SlugField(max_length=settings.MAX_LENGTH_SLUG)
+
+
+class ReviewSerializer(ChangedFieldsUpdateMixin, SparseFieldsetMixin,
+                       serializers.ModelSerializer):
     """Класс-сериализатор для Review."""
     author = serializers.SlugRelatedField(
         read_only=True,
@@ -72,24 +115,13 @@ class ReviewSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Review
-        fields = ('id', 'author', 'text', 'score', 'pub_date',)
-        read_only_fields = ('id', 'author', 'pub_date',)
-
-    def validate(self, data):
-        request = self.context['request']
-        if request.method == 'POST' and Review.objects.filter(
-                title=get_object_or_404(
-                    Title,
-                    pk=self.context['view'].kwargs.get('title_id')),
-                author=request.user
-        ).exists():
-            raise ValidationError(
-                f"Пользователь {request.user.username} "
-                "уже оставил отзыв к произведению.")
-        return data
-
-
-class CommentSerializer(serializers.ModelSerializer):
+        fields = ('id', 'author', 'text', 'score', 'pub_date',
+                  'comment_count', 'last_comment_at',)
+        read_only_fields = ('id', 'author', 'pub_date',
+                            'comment_count', 'last_comment_at',)
+
+
+class CommentSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Класс-сериализатор для Comment."""
     author = serializers.SlugRelatedField(
         read_only=True,
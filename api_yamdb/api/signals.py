@@ -0,0 +1,71 @@
+"""Проект спринта 10: обработчики сигналов моделей приложения Api."""
+from django.db import transaction
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete)
+from django.dispatch import receiver
+from reviews.models import (Category, Comment, CustomUser, Genre, GenreTitle,
+                            Review, Title)
+
+from .authentication import forget_user
+from .cache import invalidate_tags
+from .effects import user_deleted
+
+# Теги кэша ответов, которые устаревают при изменении модели.
+MODEL_CACHE_TAGS = {
+    Title: lambda title: ('title',),
+    GenreTitle: lambda genre_title: ('title',),
+    # Тег review — у всех ответов со встроенными отзывами (?include=).
+    Review: lambda review: (
+        'title', f'reviews-{review.title_id}', 'review'
+    ),
+    # Список отзывов произведения со счётчиками комментариев сбрасывает
+    # ReviewCommentsEffect: здесь отзыв не читается, чтобы каскадное
+    # удаление комментариев не делало запрос на каждую строку.
+    Comment: lambda comment: (f'comments-{comment.review_id}', 'review'),
+    Category: lambda category: ('category',),
+    Genre: lambda genre: ('genre',),
+}
+
+
+def invalidate_response_cache(sender, instance, **kwargs):
+    invalidate_tags(*MODEL_CACHE_TAGS[sender](instance))
+
+
+# Обработчики подключаются только к моделям с тегами: у прочих моделей
+# каскадное удаление остаётся быстрым, без чтения строк.
+for model in MODEL_CACHE_TAGS:
+    post_save.connect(invalidate_response_cache, sender=model)
+    post_delete.connect(invalidate_response_cache, sender=model)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def invalidate_title_genres(sender, action, **kwargs):
+    if action.startswith('post_'):
+        invalidate_tags('title')
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def invalidate_author_names(sender, instance, signal, **kwargs):
+    # Тег user — у ответов с именами авторов отзывов и комментариев:
+    # регистрация и правка профиля его не сбрасывают. Сохранение в обход
+    # save() (loaddata) сбрасывает тег на всякий случай.
+    changed = getattr(instance, 'changed_token_claims', ('username',))
+    if signal is post_delete or 'username' in changed:
+        invalidate_tags('user')
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def reset_cached_user(sender, instance, **kwargs):
+    # Пользователь и версия токенов перечитываются из базы при следующем
+    # запросе.
+    user_id = instance.pk
+    transaction.on_commit(lambda: forget_user(user_id))
+
+
+@receiver(pre_delete, sender=CustomUser)
+def subtract_user_reviews(sender, instance, **kwargs):
+    # Отзывы и комментарии пользователя удаляются каскадно: их вклад в
+    # агрегаты вычитается до удаления, пока строки ещё читаются.
+    user_deleted(instance)
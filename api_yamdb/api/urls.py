@@ -3,7 +3,7 @@ from rest_framework.routers import DefaultRouter
 
 from .views import (CategoryViewSet, CommentViewSet, GenreViewSet,
                     ReviewViewSet, TitleViewSet, UserViewSet, get_jwt_token,
-                    signup)
+                    response_cache_stats, signup, user_cache_stats)
 
 router_v1 = DefaultRouter()
 router_v1.register(r'categories', CategoryViewSet)
@@ -27,4 +27,6 @@ pin_code_auth_url = [
 urlpatterns = [
     path('v1/', include(router_v1.urls)),
     path('v1/auth/', include(pin_code_auth_url)),
+    path('v1/cache-stats/', response_cache_stats, name='cache_stats'),
+    path('v1/user-cache-stats/', user_cache_stats, name='user_cache_stats'),
 ]
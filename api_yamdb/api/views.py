@@ -1,23 +1,37 @@
 """Проект спринта 10: модуль контроллер приложения Api."""
 from django.conf import settings
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
-from django.db import IntegrityError
-from django.db.models import Avg
+from django.db import IntegrityError, transaction
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, mixins, permissions, status, viewsets
+from rest_framework import (filters, generics, mixins, permissions, status,
+                            viewsets)
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.validators import ValidationError
 from rest_framework.viewsets import ModelViewSet
-from rest_framework_simplejwt.tokens import AccessToken
-from reviews.models import Category, CustomUser, Genre, Review, Title
+from reviews.models import (Category, Comment, CustomUser, Genre, Review,
+                            ScoreHistogram, Title)
+from reviews.outbox import enqueue_email
 
-from .filters import TitleFilter
+from .authentication import get_access_token, user_cache
+from .bulk import bulk_create_titles
+from .cache import (CachedListMixin, CachedListRetrieveMixin,
+                    ConditionalGetMixin, get_stats)
+from .effects import (email_enqueued, review_comments_changed,
+                      review_scores_changed)
+from .fieldsets import get_sparse_fields
+from .filters import TitleFilter, TitleSearchFilter
+from .includes import get_limit_param
+from .pagination import ThreadPagination, TitlePagination
 from .permissions import (IsAdmin, IsAdminOrReadOnly,
                           IsAuthorIsAdminIsModeratorOrReadOnly)
+from .projections import ProjectedListMixin, TitleProjection
+from .querysets import optimize_for_serializer
+from .routes import NestedRouteMixin
 from .serializers import (CategorySerializer, CommentSerializer,
                           GenreSerializer, RegisterDataSerializer,
                           ReviewSerializer, TitleGetSerializer,
@@ -25,7 +39,22 @@ from .serializers import (CategorySerializer, CommentSerializer,
                           UserSerializer)
 
 
+class SparseFieldsetViewMixin:
+    """Подготавливает queryset под поля, выбранные ?fields= и ?omit=."""
+
+    def get_sparse_fields(self):
+        return get_sparse_fields(
+            self.request, self.get_serializer_class().Meta.fields
+        )
+
+    def optimize_queryset(self, queryset):
+        return optimize_for_serializer(
+            queryset, self.get_serializer_class(), self.get_sparse_fields()
+        )
+
+
 class NameSlugBaseViewSet(
+    CachedListMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     mixins.DestroyModelMixin,
@@ -41,66 +70,208 @@ class NameSlugBaseViewSet(
 
 class CategoryViewSet(NameSlugBaseViewSet):
     """Класс-вьюсет для Category."""
-    queryset = Category.objects.all()
+    queryset = Category.objects.order_by(*Category.LIST_ORDERING)
     serializer_class = CategorySerializer
+    cache_tags = ('category',)
 
 
 class GenreViewSet(NameSlugBaseViewSet):
     """Класс-вьюсет для Genre."""
-    queryset = Genre.objects.all()
+    queryset = Genre.objects.order_by(*Genre.LIST_ORDERING)
     serializer_class = GenreSerializer
+    cache_tags = ('genre',)
 
 
-class TitleViewSet(ModelViewSet):
+class TitleViewSet(ConditionalGetMixin, CachedListRetrieveMixin,
+                   ProjectedListMixin, SparseFieldsetViewMixin, ModelViewSet):
     """Классы-вьюсет для Title."""
-    queryset = Title.objects.annotate(rating=Avg('reviews__score'))
-    # Сортруем queryset по рейтингу
+    queryset = Title.objects.all()
+    projection_class = TitleProjection
+    cache_tags = ('title', 'genre', 'category')
     permission_classes = (IsAdminOrReadOnly,)
-    pagination_class = PageNumberPagination
+    pagination_class = TitlePagination
     filter_backends = (
         DjangoFilterBackend,
-        filters.SearchFilter,
-        filters.OrderingFilter
+        filters.OrderingFilter,
+        TitleSearchFilter,
     )
     filterset_class = TitleFilter
     ordering_fields = ('name', 'year', 'genre', 'category', 'rating',)
+    ordering = ('id',)
 
     def get_serializer_class(self):
         if self.request.method in permissions.SAFE_METHODS:
             return TitleGetSerializer
         return TitleSerializer
 
+    def get_cache_tags(self):
+        # Встроенные отзывы зависят от отзывов, комментариев и авторов.
+        if self.get_includes():
+            return self.cache_tags + ('review', 'user')
+        return self.cache_tags
 
-class ReviewViewSet(ModelViewSet):
+    def get_queryset(self):
+        return self.optimize_queryset(super().get_queryset())
+
+    @action(methods=['get', ], detail=True, url_path='score-histogram')
+    def score_histogram(self, request, pk=None):
+        """Количество отзывов с каждой оценкой"""
+        # get_object_or_404 из DRF отвечает 404 и на нечисловой pk.
+        try:
+            histogram = generics.get_object_or_404(
+                ScoreHistogram, title_id=pk
+            )
+        except Http404:
+            title = generics.get_object_or_404(Title.objects.only('id'), pk=pk)
+            histogram = ScoreHistogram(title_id=title.pk)
+        return Response(histogram.as_dict())
+
+    @action(
+        methods=['post', ],
+        detail=False,
+        url_path='bulk',
+        permission_classes=(IsAdmin,),
+    )
+    def bulk(self, request):
+        """Пакетное создание произведений с ошибками по каждому элементу"""
+        if not isinstance(request.data, list):
+            raise ValidationError('Ожидается список произведений.')
+        if len(request.data) > settings.MAX_BULK_TITLES:
+            raise ValidationError(
+                f'За один запрос можно создать не более '
+                f'{settings.MAX_BULK_TITLES} произведений.'
+            )
+        results = bulk_create_titles(request.data)
+        created = sum('errors' not in result for result in results)
+        return Response(
+            {'created': created, 'results': results},
+            status=(status.HTTP_201_CREATED if created
+                    else status.HTTP_400_BAD_REQUEST)
+        )
+
+
+class ReviewViewSet(ConditionalGetMixin, NestedRouteMixin,
+                    SparseFieldsetViewMixin, ModelViewSet):
     """Классы-вьюсет для Review."""
     serializer_class = ReviewSerializer
     permission_classes = (IsAuthorIsAdminIsModeratorOrReadOnly,)
-    pagination_class = PageNumberPagination
+    pagination_class = ThreadPagination
 
-    def get_title(self):
-        return get_object_or_404(Title, id=self.kwargs.get('title_id'))
+    def get_cache_tags(self):
+        return (f'reviews-{self.kwargs.get("title_id")}', 'user')
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user, title=self.get_title())
+        # Повторный отзыв отсекает ограничение unique_title в базе,
+        # без предварительного запроса exists(). Отзыв автора ищется
+        # только после ошибки, чтобы не выдать за повтор другие ошибки;
+        # вставка идёт без транзакции, поэтому после ошибки соединение
+        # пригодно для запроса.
+        title = self.get_title()
+        try:
+            review = serializer.save(author=self.request.user, title=title)
+        except IntegrityError:
+            if not Review.objects.filter(
+                title=title, author_id=self.request.user.pk
+            ).exists():
+                raise
+            raise ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    f'Пользователь {self.request.user.username} '
+                    'уже оставил отзыв к произведению.'
+                ]
+            })
+        review_scores_changed(review.title_id, added=review.score)
+
+    @transaction.atomic
+    def perform_update(self, serializer):
+        old_score = serializer.instance.score
+        review = serializer.save()
+        if review.score != old_score:
+            review_scores_changed(
+                review.title_id, removed=old_score, added=review.score
+            )
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        instance.delete()
+        review_scores_changed(instance.title_id, removed=instance.score)
 
     def get_queryset(self):
-        return self.get_title().reviews.all()
+        return self.optimize_queryset(self.get_title().reviews.all())
+
+    @action(methods=['get', ], detail=False, url_path='comments')
+    def comments(self, request, title_id=None):
+        """Первые комментарии к нескольким отзывам произведения"""
+        review_ids = self.get_batch_review_ids()
+        limit = get_limit_param(
+            request, 'limit', settings.BATCH_COMMENTS_LIMIT,
+            settings.MAX_BATCH_COMMENTS_LIMIT
+        )
+        comments = Comment.objects.filter(
+            review_id__in=review_ids, review__title=self.get_title()
+        ).first_per('review', limit)
+        fields = get_sparse_fields(request, CommentSerializer.Meta.fields)
+        comments = optimize_for_serializer(
+            comments, CommentSerializer, fields
+        )
+        results = {str(review_id): [] for review_id in review_ids}
+        for comment in comments:
+            results[str(comment.review_id)].append(comment)
+        context = self.get_serializer_context()
+        return Response({
+            review_id: CommentSerializer(
+                review_comments, many=True, context=context
+            ).data
+            for review_id, review_comments in results.items()
+        })
 
+    def get_batch_review_ids(self):
+        value = self.request.query_params.get('review_ids', '')
+        try:
+            review_ids = list(dict.fromkeys(
+                int(review_id) for review_id in value.split(',') if review_id
+            ))
+            # id вне диапазона BigAutoField база не принимает в запрос.
+            if not all(0 < review_id < 2 ** 63 for review_id in review_ids):
+                raise ValueError(value)
+        except ValueError:
+            raise ValidationError(
+                {'review_ids': ['Ожидается список id отзывов через запятую.']}
+            )
+        if not review_ids:
+            raise ValidationError(
+                {'review_ids': ['Укажите id отзывов.']}
+            )
+        if len(review_ids) > settings.MAX_BATCH_REVIEWS:
+            raise ValidationError({'review_ids': [
+                f'За один запрос можно получить комментарии не более чем '
+                f'к {settings.MAX_BATCH_REVIEWS} отзывам.'
+            ]})
+        return review_ids
 
-class CommentViewSet(ModelViewSet):
+
+class CommentViewSet(ConditionalGetMixin, NestedRouteMixin,
+                     SparseFieldsetViewMixin, ModelViewSet):
     """Классы-вьюсет для Comment."""
     serializer_class = CommentSerializer
     permission_classes = (IsAuthorIsAdminIsModeratorOrReadOnly,)
-    pagination_class = PageNumberPagination
+    pagination_class = ThreadPagination
 
-    def get_review(self):
-        return get_object_or_404(Review, id=self.kwargs.get('review_id'))
+    def get_cache_tags(self):
+        return (f'comments-{self.kwargs.get("review_id")}', 'user')
 
+    @transaction.atomic
     def perform_create(self, serializer):
         serializer.save(author=self.request.user, review=self.get_review())
+        review_comments_changed(self.get_review(), 1)
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        instance.delete()
+        review_comments_changed(self.get_review(), -1)
 
     def get_queryset(self):
-        return self.get_review().comments.all()
+        return self.optimize_queryset(self.get_review().comments.all())
 
 
 @api_view(['POST'])
@@ -113,24 +284,41 @@ def signup(request):
     username = serializer.validated_data['username']
     email = serializer.validated_data['email']
     try:
-        user, _ = CustomUser.objects.get_or_create(
-            username=username, email=email
-        )
+        # Письмо ставится в очередь в той же транзакции, что и
+        # пользователь, и отправляется в фоне после её фиксации.
+        with transaction.atomic():
+            user, _ = CustomUser.objects.get_or_create(
+                username=username, email=email
+            )
+            confirmation_code = default_token_generator.make_token(user)
+            enqueue_email(
+                subject='YaMDb registration',
+                body=f'Your confirmation code: {confirmation_code}',
+                to=user.email,
+            )
+            email_enqueued()
     except IntegrityError:
         raise ValidationError(
             f'Имя {username} или адрес электронной почты '
             f'{email} уже использовались для регистрации пользователей.'
         )
-    confirmation_code = default_token_generator.make_token(user)
-    send_mail(
-        subject='YaMDb registration',
-        message=f'Your confirmation code: {confirmation_code}',
-        from_email=settings.DEFAULT_FROM_EMAIL,
-        recipient_list=[user.email],
-    )
     return Response(serializer.data, status=status.HTTP_200_OK)
 
 
+@api_view(['GET'])
+@permission_classes([IsAdmin])
+def response_cache_stats(request):
+    """Счётчики попаданий и промахов кэша ответов"""
+    return Response(get_stats(), status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdmin])
+def user_cache_stats(request):
+    """Счётчики попаданий и промахов кэша пользователей аутентификации"""
+    return Response(user_cache.get_stats(), status=status.HTTP_200_OK)
+
+
 @api_view(['POST'])
 @permission_classes([permissions.AllowAny])
 def get_jwt_token(request):
@@ -145,7 +333,7 @@ def get_jwt_token(request):
     if default_token_generator.check_token(
             user, serializer.validated_data['confirmation_code']
     ):
-        token = AccessToken.for_user(user)
+        token = get_access_token(user)
         return Response({'token': str(token)}, status=status.HTTP_200_OK)
 
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -172,7 +360,9 @@ class UserViewSet(viewsets.ModelViewSet):
         serializer_class=UserEditSerializer,
     )
     def users_own_profile(self, request):
-        user = request.user
+        # Пользователь из токена содержит только поля для проверки
+        # разрешений: профиль читается из базы целиком.
+        user = get_object_or_404(CustomUser, pk=request.user.pk)
         if request.method == 'GET':
             return Response(
                 self.get_serializer(user).data, status=status.HTTP_200_OK
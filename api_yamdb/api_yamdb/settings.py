@@ -30,9 +30,9 @@ INSTALLED_APPS = [
 
 AUTH_USER_MODEL = 'reviews.CustomUser'
 
-EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+EMAIL_BACKEND = 'reviews.spool.SpoolEmailBackend'
 
-EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
+EMAIL_SPOOL_PATH = BASE_DIR / 'sent_emails'
 
 DEFAULT_FROM_EMAIL = 'admin@yamdb.ru'
 
@@ -41,7 +41,7 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAdminUser',
     ),
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.StatelessJWTAuthentication',
     ),
     'DEFAULT_FILTER_BACKENDS': (
         'rest_framework.filters.OrderingFilter',
@@ -57,6 +57,20 @@ SIMPLE_JWT = {
 }
 
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Кэш ответов на анонимные GET-запросы к произведениям и классификаторам
+RESPONSE_CACHE_ALIAS = 'default'
+RESPONSE_CACHE_TIMEOUT = 5 * 60
+# Версии тегов кэша ответов должны быть общими для всех процессов: кэш
+# в памяти (LocMemCache) допустим только при запуске одного процесса.
+# При нескольких процессах укажите Memcached или Redis и выключите флаг.
+RESPONSE_CACHE_SINGLE_PROCESS = True
+
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -146,3 +160,41 @@ MAX_LENGTH_NAME = 256
 MAX_LENGTH_SLUG = 50
 # Максимальное количество символов slug
 MAX_CONFIRMATION_CODE = 39
+# Максимальное количество произведений в пакетном создании
+MAX_BULK_TITLES = 1000
+# Максимальное количество отзывов в пакетном запросе комментариев
+MAX_BATCH_REVIEWS = 100
+# Комментариев к каждому отзыву в пакетном запросе: по умолчанию и максимум
+BATCH_COMMENTS_LIMIT = 3
+MAX_BATCH_COMMENTS_LIMIT = 50
+# Встраиваемых объектов связи (?include=) на объект: по умолчанию и максимум
+INCLUDE_LIMIT = 3
+MAX_INCLUDE_LIMIT = 20
+# Конвейер побочных действий записи: потоки, размер очереди, пауза перед
+# повтором упавшего действия в секундах и режим, в котором действия
+# выполняются сразу после фиксации (для тестов)
+SIDE_EFFECTS_WORKERS = 2
+SIDE_EFFECTS_QUEUE_SIZE = 1000
+SIDE_EFFECTS_RETRY_DELAY = 0.5
+SIDE_EFFECTS_SYNC = False
+# Очередь исходящих писем: размер пачки на одно соединение, пауза перед
+# повтором (удваивается с каждой попыткой до максимума), число попыток,
+# аренда захваченной пачки и интервал отправки команды send_outbox,
+# в секундах
+OUTBOX_BATCH_SIZE = 100
+OUTBOX_RETRY_DELAY = 30
+OUTBOX_MAX_RETRY_DELAY = 60 * 60
+OUTBOX_MAX_ATTEMPTS = 8
+OUTBOX_LEASE = 5 * 60
+OUTBOX_FLUSH_INTERVAL = 5
+# Почтовый спул: размер сегмента в байтах и срок хранения писем в днях
+EMAIL_SPOOL_SEGMENT_SIZE = 16 * 1024 * 1024
+EMAIL_SPOOL_RETENTION = 30
+# Кэш версий токенов пользователей: столько секунд отозванный токен может
+# приниматься процессом, не видевшим изменения пользователя
+TOKEN_VERSION_CACHE_ALIAS = 'default'
+TOKEN_VERSION_CACHE_TIMEOUT = 60
+# LRU-кэш пользователей процесса для JWT-аутентификации: число записей
+# и время жизни записи в секундах
+USER_CACHE_SIZE = 1000
+USER_CACHE_TIMEOUT = 60
@@ -0,0 +1,16 @@
+"""Команда очистки почтового спула."""
+from django.core.management.base import BaseCommand
+from reviews.spool import MailSpool
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет сегменты почтового спула старше EMAIL_SPOOL_RETENTION '
+        'дней и сегменты, письма которых заменены более поздними.'
+    )
+
+    def handle(self, *args, **options):
+        removed = MailSpool().compact()
+        self.stdout.write(self.style.SUCCESS(
+            f'Удалено сегментов спула: {len(removed)}'
+        ))
@@ -0,0 +1,25 @@
+"""Команда чтения писем получателю из почтового спула."""
+from django.core.management.base import BaseCommand, CommandError
+from reviews.spool import MailSpool
+
+
+class Command(BaseCommand):
+    help = 'Выводит последнее письмо получателю из почтового спула.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('recipient', help='Адрес получателя.')
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Вывести все письма получателю, от старых к новым.'
+        )
+
+    def handle(self, *args, **options):
+        messages = MailSpool().lookup(
+            options['recipient'], latest=not options['all']
+        )
+        if not messages:
+            raise CommandError(
+                f'Писем для {options["recipient"]} в спуле нет.'
+            )
+        for message in messages:
+            self.stdout.write(message.as_string())
@@ -0,0 +1,15 @@
+"""Команда пересборки гистограмм оценок произведений."""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from reviews.models import ScoreHistogram
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает гистограммы оценок произведений по таблице отзывов.'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            created = ScoreHistogram.objects.rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(f'Пересобрано гистограмм оценок: {created}')
+        )
@@ -0,0 +1,18 @@
+"""Команда пересчёта сохранённых счётчиков комментариев отзывов."""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from reviews.models import Review
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает количество комментариев и дату последнего '
+        'комментария отзывов по таблице комментариев.'
+    )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            updated = Review.objects.recalculate_comment_stats()
+        self.stdout.write(self.style.SUCCESS(
+            f'Пересчитаны счётчики комментариев отзывов: {updated}'
+        ))
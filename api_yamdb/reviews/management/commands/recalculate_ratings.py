@@ -0,0 +1,18 @@
+"""Команда пересчёта сохранённых агрегатов рейтинга произведений."""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from reviews.models import Title
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает сумму оценок, количество отзывов и рейтинг '
+        'произведений по таблице отзывов.'
+    )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            updated = Title.objects.recalculate_ratings()
+        self.stdout.write(
+            self.style.SUCCESS(f'Пересчитан рейтинг произведений: {updated}')
+        )
@@ -0,0 +1,36 @@
+"""Команда фоновой отправки писем из очереди OutboxEmail."""
+from django.core.management.base import BaseCommand
+from reviews.outbox import OutboxDispatcher
+
+
+class Command(BaseCommand):
+    help = (
+        'Отправляет письма из очереди исходящей почты, повторяя неудачные '
+        'попытки с нарастающей паузой.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Отправить письма, срок которых наступил, и завершиться.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=None,
+            help='Писем на одно соединение с почтовым сервером.'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=None,
+            help='Пауза между отправками очереди, в секундах.'
+        )
+
+    def report(self, sent, failed, rate):
+        self.stdout.write(self.style.SUCCESS(
+            f'Отправлено писем: {sent}, с ошибкой: {failed}, '
+            f'писем в секунду: {rate:.1f}'
+        ))
+
+    def handle(self, *args, **options):
+        OutboxDispatcher(
+            batch_size=options['batch_size'],
+            flush_interval=options['interval'],
+        ).run(once=options['once'], report=self.report)
@@ -0,0 +1,21 @@
+from django.db import migrations
+from reviews.search import install_title_search, uninstall_title_search
+
+
+def create_search_index(apps, schema_editor):
+    install_title_search(schema_editor.connection, rebuild=True)
+
+
+def drop_search_index(apps, schema_editor):
+    uninstall_title_search(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_title_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 3.2 on 2026-10-18 17:53
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0009_title_search_index'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='category',
+            options={'ordering': ('name', 'slug'), 'verbose_name': 'Категория', 'verbose_name_plural': 'Категории'},
+        ),
+        migrations.AlterModelOptions(
+            name='genre',
+            options={'ordering': ('name', 'slug'), 'verbose_name': 'Жанр', 'verbose_name_plural': 'Жанры'},
+        ),
+    ]
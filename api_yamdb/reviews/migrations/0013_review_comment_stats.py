@@ -0,0 +1,44 @@
+# Generated by Django 3.2 on 2026-10-18 18:06
+
+from django.db import migrations, models
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_comment_stats(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    Comment = apps.get_model('reviews', 'Comment')
+    comments = Comment.objects.filter(
+        review=OuterRef('pk')
+    ).order_by().values('review')
+    Review.objects.update(
+        comment_count=Coalesce(
+            Subquery(comments.annotate(total=Count('id')).values('total')), 0
+        ),
+        last_comment_at=Subquery(
+            comments.annotate(last=Max('pub_date')).values('last')
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0012_review_comment_id_tiebreak'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='review',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество комментариев'),
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='last_comment_at',
+            field=models.DateTimeField(editable=False, null=True, verbose_name='Дата последнего комментария'),
+        ),
+        migrations.RunPython(
+            fill_comment_stats, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 3.2 on 2026-10-18 18:54
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0016_customuser_token_version'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='category',
+            options={'verbose_name': 'Категория', 'verbose_name_plural': 'Категории'},
+        ),
+        migrations.AlterModelOptions(
+            name='genre',
+            options={'verbose_name': 'Жанр', 'verbose_name_plural': 'Жанры'},
+        ),
+    ]
@@ -2,11 +2,22 @@
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
-from django.db.models import UniqueConstraint
-
+from django.db import IntegrityError, connections, models, transaction
+from django.db.models import (Avg, Count, F, FloatField, Max, OuterRef, Q,
+                              Subquery, Sum, UniqueConstraint, Value, Window)
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Cast, Coalesce, NullIf, RowNumber
+from django.utils import timezone
+
+from .search import (TITLE_FTS_TABLE, build_match_query,
+                     supports_full_text_search)
 from .validators import model_validate_username, model_validate_year
 
+# Допустимые оценки отзыва.
+SCORES = range(1, 11)
+# СУБД с INSERT ... ON CONFLICT DO UPDATE.
+UPSERT_VENDORS = ('sqlite', 'postgresql')
+
 
 class CustomUser(AbstractUser):
     """Модель пользователя."""
@@ -51,6 +62,14 @@ class CustomUser(AbstractUser):
                                  help_text='Укажите фамилию пользователя',
                                  blank=True,
                                  )
+    # Увеличивается при смене полей TOKEN_CLAIM_FIELDS: access-токены с
+    # прежней версией перестают приниматься.
+    token_version = models.PositiveIntegerField(
+        verbose_name='версия токенов',
+        default=0,
+        editable=False,
+    )
+    TOKEN_CLAIM_FIELDS = ('username', 'role', 'is_staff', 'is_active')
     CONCLUSION_STR = (
         'Пользователь: {username:.20}, '
         'Имя: {first_name:.20}, '
@@ -73,6 +92,37 @@ class CustomUser(AbstractUser):
         verbose_name = 'Пользователь'
         verbose_name_plural = 'Пользователи'
 
+    def get_changed_token_claims(self, update_fields=None):
+        """Сохраняемые поля access-токена, отличные от записанных в базе."""
+        fields = [
+            field for field in self.TOKEN_CLAIM_FIELDS
+            if update_fields is None or field in update_fields
+        ]
+        if not self.pk or not fields:
+            return ()
+        stored = CustomUser.objects.filter(pk=self.pk).values_list(
+            *fields
+        ).first()
+        if stored is None:
+            return ()
+        return tuple(
+            field for field, value in zip(fields, stored)
+            if getattr(self, field) != value
+        )
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        # Читается обработчиками post_save: смена имени сбрасывает кэш
+        # ответов с именами авторов.
+        self.changed_token_claims = self.get_changed_token_claims(
+            update_fields
+        )
+        if self.changed_token_claims:
+            self.token_version += 1
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'token_version'}
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return self.CONCLUSION_STR.format(
             bio=self.bio,
@@ -102,6 +152,8 @@ class NameSlugBaseModel(models.Model):
     CONCLUSION_STR = (
         f'{name}, имеет идентификатор: {slug}'
     )
+    # Порядок в списках, вложенных в ответ о произведении.
+    LIST_ORDERING = ('name', 'slug')
 
     class Meta:
         abstract = True
@@ -116,7 +168,7 @@ class NameSlugBaseModel(models.Model):
 class Category(NameSlugBaseModel):
     """Класс управления данными категорий."""
 
-    class Meta:
+    class Meta(NameSlugBaseModel.Meta):
         verbose_name = 'Категория'
         verbose_name_plural = 'Категории'
 
@@ -124,11 +176,89 @@ class Category(NameSlugBaseModel):
 class Genre(NameSlugBaseModel):
     """Класс управления данными жанров."""
 
-    class Meta:
+    class Meta(NameSlugBaseModel.Meta):
         verbose_name = 'Жанр'
         verbose_name_plural = 'Жанры'
 
 
+class TitleQuerySet(models.QuerySet):
+    """Набор запросов произведений с обслуживанием агрегатов рейтинга."""
+
+    def apply_review_delta(self, title_id, score_delta, count_delta):
+        """Атомарно сдвигает сумму оценок и число отзывов произведения.
+
+        Все выражения вычисляются одним UPDATE по старым значениям строки,
+        поэтому параллельные записи отзывов не теряют изменений.
+        """
+        return self.filter(pk=title_id).update(
+            score_sum=F('score_sum') + score_delta,
+            review_count=F('review_count') + count_delta,
+            rating=(
+                Cast(F('score_sum') + score_delta, FloatField())
+                / NullIf(F('review_count') + count_delta, 0)
+            ),
+        )
+
+    def recalculate_ratings(self):
+        """Пересчитывает агрегаты рейтинга по таблице отзывов."""
+        reviews = Review.objects.filter(
+            title=OuterRef('pk')
+        ).order_by().values('title')
+        return self.update(
+            score_sum=Coalesce(
+                Subquery(reviews.annotate(total=Sum('score')).values('total')),
+                0
+            ),
+            review_count=Coalesce(
+                Subquery(reviews.annotate(total=Count('id')).values('total')),
+                0
+            ),
+            rating=Subquery(
+                reviews.annotate(average=Avg('score')).values('average')
+            ),
+        )
+
+    def filter_full_text(self, text, columns=('name', 'description')):
+        """Оставляет произведения, подходящие под полнотекстовый запрос."""
+        match = build_match_query(text, columns)
+        if not match:
+            return self.none()
+        if not supports_full_text_search(connections[self.db]):
+            return self._filter_contains(text, columns)
+        return self.filter(pk__in=RawSQL(
+            f'SELECT rowid FROM {TITLE_FTS_TABLE} '
+            f'WHERE {TITLE_FTS_TABLE} MATCH %s',
+            (match,)
+        ))
+
+    def search(self, text):
+        """Полнотекстовый поиск с оценкой релевантности search_rank.
+
+        Чем меньше search_rank (bm25), тем выше релевантность.
+        """
+        match = build_match_query(text)
+        if not match or not supports_full_text_search(connections[self.db]):
+            queryset = self._filter_contains(text) if match else self.none()
+            return queryset.annotate(
+                search_rank=Value(0.0, output_field=FloatField())
+            )
+        return self.extra(
+            select={'search_rank': f'bm25({TITLE_FTS_TABLE})'},
+            tables=(TITLE_FTS_TABLE,),
+            where=(
+                f'{TITLE_FTS_TABLE}.rowid = {self.model._meta.db_table}.id',
+                f'{TITLE_FTS_TABLE} MATCH %s',
+            ),
+            params=(match,),
+        )
+
+    def _filter_contains(self, text, columns=('name', 'description')):
+        condition = Q()
+        for column in columns:
+            condition |= Q(**{f'{column}__icontains': text})
+        return self.filter(condition)
+
+
 class Title(models.Model):
     """Класс управления данными произведений."""
     name = models.CharField(
@@ -163,6 +293,24 @@ class Title(models.Model):
         verbose_name='жанр',
         blank=False
     )
+    score_sum = models.PositiveIntegerField(
+        verbose_name='Сумма оценок',
+        default=0,
+        editable=False,
+    )
+    review_count = models.PositiveIntegerField(
+        verbose_name='Количество отзывов',
+        default=0,
+        editable=False,
+    )
+    rating = models.FloatField(
+        verbose_name='Рейтинг',
+        null=True,
+        editable=False,
+        db_index=True,
+    )
+
+    objects = TitleQuerySet.as_manager()
 
     CONCLUSION_STR = (
         'Произведение: {name:.20}, '
@@ -178,6 +326,11 @@ class Title(models.Model):
             UniqueConstraint(
                 fields=['name', 'year'], name='unique_name_year_title'
             )]
+        # Составные индексы для пагинации по ключу (поле сортировки, id).
+        indexes = [
+            models.Index(fields=['name', 'id'], name='title_name_id_idx'),
+            models.Index(fields=['year', 'id'], name='title_year_id_idx'),
+        ]
 
     def __str__(self):
         return self.CONCLUSION_STR.format(
@@ -230,7 +383,9 @@ class AuthorTextPubdateBaseModel(models.Model):
 
     class Meta:
         abstract = True
-        ordering = ('-pub_date',)
+        # id различает записи с одинаковой датой: страницы OFFSET и курсоры
+        # идут в одном и том же порядке по составным индексам.
+        ordering = ('-pub_date', '-id')
 
     def __str__(self):
         return self.CONCLUSION_STR.format(
@@ -240,6 +395,70 @@ class AuthorTextPubdateBaseModel(models.Model):
         )
 
 
+class RankedQuerySet(models.QuerySet):
+    """Набор запросов с выборкой первых записей каждой группы."""
+
+    def first_per(self, field, limit):
+        """Первые limit записей каждого значения field одним запросом.
+
+        Записи нумеруются ROW_NUMBER() OVER (PARTITION BY field) в порядке
+        Meta.ordering, а внешний запрос оставляет номера не больше limit.
+        Фильтры набора применяются до нумерации, поэтому окно считается
+        только по нужным группам.
+        """
+        ranked = self.order_by().annotate(row_rank=Window(
+            RowNumber(),
+            partition_by=[F(field)],
+            order_by=[
+                F(name.lstrip('-')).desc() if name.startswith('-')
+                else F(name).asc()
+                for name in self.model._meta.ordering
+            ],
+        )).values('id', 'row_rank')
+        sql, params = ranked.query.sql_with_params()
+        return self.model.objects.filter(pk__in=RawSQL(
+            f'SELECT id FROM ({sql}) ranked WHERE row_rank <= %s',
+            (*params, limit)
+        ))
+
+
+class ReviewQuerySet(RankedQuerySet):
+    """Набор запросов отзывов со счётчиками комментариев."""
+
+    def apply_comment_delta(self, review_id, count_delta):
+        """Сдвигает счётчик комментариев отзыва одним UPDATE.
+
+        Дата последнего комментария берётся подзапросом к комментариям
+        отзыва по индексу (review, -pub_date), поэтому сдвиги нескольких
+        созданий и удалений можно применять одним вызовом.
+        """
+        return self.filter(pk=review_id).update(
+            comment_count=F('comment_count') + count_delta,
+            last_comment_at=self._last_comment_at(),
+        )
+
+    def recalculate_comment_stats(self):
+        """Пересчитывает счётчики комментариев по таблице комментариев."""
+        comments = Comment.objects.filter(
+            review=OuterRef('pk')
+        ).order_by().values('review')
+        return self.update(
+            comment_count=Coalesce(
+                Subquery(comments.annotate(total=Count('id')).values('total')),
+                0
+            ),
+            last_comment_at=self._last_comment_at(),
+        )
+
+    @staticmethod
+    def _last_comment_at():
+        return Subquery(Comment.objects.filter(
+            review=OuterRef('pk')
+        ).order_by().values('review').annotate(
+            last=Max('pub_date')
+        ).values('last'))
+
+
 class Review(AuthorTextPubdateBaseModel):
     """Класс управления данными отзывов к произведениям."""
 
@@ -254,10 +473,23 @@ class Review(AuthorTextPubdateBaseModel):
         help_text='Оцените произведение',
         blank=False,
         validators=[
-            MaxValueValidator(10),
-            MinValueValidator(1)
+            MaxValueValidator(SCORES[-1]),
+            MinValueValidator(SCORES[0])
         ]
     )
+    comment_count = models.PositiveIntegerField(
+        verbose_name='Количество комментариев',
+        default=0,
+        editable=False,
+    )
+    last_comment_at = models.DateTimeField(
+        verbose_name='Дата последнего комментария',
+        null=True,
+        editable=False,
+    )
+
+    objects = ReviewQuerySet.as_manager()
+
     CONCLUSION_STR = (
         'Отзыв. {review}, '
         'Произведение: {title}, '
@@ -274,6 +506,18 @@ class Review(AuthorTextPubdateBaseModel):
                 name='unique_title',
             )
         ]
+        # Составные индексы под сортировку по умолчанию: страница отзывов
+        # произведения или автора читается по индексу без сортировки.
+        indexes = [
+            models.Index(
+                fields=['title', '-pub_date', '-id'],
+                name='review_title_pub_date_idx',
+            ),
+            models.Index(
+                fields=['author', '-pub_date', '-id'],
+                name='review_author_pub_date_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.CONCLUSION_STR.format(
@@ -293,6 +537,8 @@ class Comment(AuthorTextPubdateBaseModel):
         blank=False
     )
 
+    objects = RankedQuerySet.as_manager()
+
     CONCLUSION_STR = (
         'Комментарий. {comment}, '
         'Комментируемый отзыв: {review}'
@@ -302,9 +548,157 @@ class Comment(AuthorTextPubdateBaseModel):
         default_related_name = 'comments'
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = [
+            models.Index(
+                fields=['review', '-pub_date', '-id'],
+                name='comment_review_pub_date_idx',
+            ),
+            models.Index(
+                fields=['author', '-pub_date', '-id'],
+                name='comment_author_pub_date_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.CONCLUSION_STR.format(
             comment=super().__str__(),
             title=self.review
         )
+
+
+class ScoreHistogramQuerySet(models.QuerySet):
+    """Набор запросов гистограмм оценок с инкрементальным обновлением."""
+
+    def apply_score_delta(self, title_id, deltas):
+        """Сдвигает счётчики оценок произведения: deltas = {оценка: сдвиг}.
+
+        Строка гистограммы создаётся первым отзывом произведения. На СУБД
+        с INSERT ... ON CONFLICT вставка и сдвиг выполняются одним
+        запросом, на прочих — UPDATE, а при его промахе вставка строки.
+        """
+        deltas = {score: delta for score, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        connection = connections[self.db]
+        if connection.vendor in UPSERT_VENDORS:
+            return self._upsert(connection, title_id, deltas)
+        changes = {
+            f'score_{score}': F(f'score_{score}') + delta
+            for score, delta in deltas.items()
+        }
+        if self.filter(title_id=title_id).update(**changes):
+            return
+        try:
+            with transaction.atomic(using=self.db):
+                self.create(title_id=title_id, **{
+                    f'score_{score}': max(delta, 0)
+                    for score, delta in deltas.items()
+                })
+        except IntegrityError:
+            self.filter(title_id=title_id).update(**changes)
+
+    def _upsert(self, connection, title_id, deltas):
+        quote = connection.ops.quote_name
+        table = quote(self.model._meta.db_table)
+        columns = [quote(f'score_{score}') for score in SCORES]
+        updates = ', '.join(
+            f'{quote(f"score_{score}")} = '
+            f'{table}.{quote(f"score_{score}")} + %s'
+            for score in deltas
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {table} ({quote("title_id")}, '
+                f'{", ".join(columns)}) '
+                f'VALUES (%s, {", ".join(["%s"] * len(columns))}) '
+                f'ON CONFLICT ({quote("title_id")}) DO UPDATE SET {updates}',
+                [
+                    title_id,
+                    *(max(deltas.get(score, 0), 0) for score in SCORES),
+                    *deltas.values(),
+                ]
+            )
+
+    def rebuild(self):
+        """Пересобирает гистограммы по таблице отзывов."""
+        counters = {
+            f'score_{score}': Count('id', filter=Q(score=score))
+            for score in SCORES
+        }
+        rows = Review.objects.order_by().values('title_id').annotate(
+            **counters
+        )
+        self.all().delete()
+        return len(self.bulk_create(self.model(**row) for row in rows))
+
+
+class ScoreHistogram(models.Model):
+    """Гистограмма оценок произведения: число отзывов с каждой оценкой."""
+
+    title = models.OneToOneField(
+        Title,
+        verbose_name='Произведение',
+        primary_key=True,
+        on_delete=models.CASCADE,
+        related_name='score_histogram',
+    )
+    score_1 = models.PositiveIntegerField('Оценок 1', default=0)
+    score_2 = models.PositiveIntegerField('Оценок 2', default=0)
+    score_3 = models.PositiveIntegerField('Оценок 3', default=0)
+    score_4 = models.PositiveIntegerField('Оценок 4', default=0)
+    score_5 = models.PositiveIntegerField('Оценок 5', default=0)
+    score_6 = models.PositiveIntegerField('Оценок 6', default=0)
+    score_7 = models.PositiveIntegerField('Оценок 7', default=0)
+    score_8 = models.PositiveIntegerField('Оценок 8', default=0)
+    score_9 = models.PositiveIntegerField('Оценок 9', default=0)
+    score_10 = models.PositiveIntegerField('Оценок 10', default=0)
+
+    objects = ScoreHistogramQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'Гистограмма оценок'
+        verbose_name_plural = 'Гистограммы оценок'
+
+    def __str__(self):
+        return f'Гистограмма оценок произведения {self.title_id}'
+
+    def as_dict(self):
+        return {
+            str(score): getattr(self, f'score_{score}') for score in SCORES
+        }
+
+
+class OutboxEmail(models.Model):
+    """Исходящее письмо, ожидающее отправки фоновым обработчиком."""
+
+    subject = models.CharField('Тема', max_length=255)
+    body = models.TextField('Текст')
+    from_email = models.CharField('Отправитель', max_length=254)
+    to = models.EmailField('Получатель', max_length=254, db_index=True)
+    created_at = models.DateTimeField('Создано', auto_now_add=True)
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    # Срок следующей попытки; NULL — попытки исчерпаны.
+    next_attempt_at = models.DateTimeField(
+        'Следующая попытка', null=True, default=timezone.now
+    )
+    sent_at = models.DateTimeField('Отправлено', null=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    # Метка обработчика, захватившего письмо на отправку.
+    lease_token = models.CharField(
+        'Метка захвата', max_length=32, blank=True, db_index=True
+    )
+
+    class Meta:
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        # Очередь выбирается по частичному индексу только из неотправленных.
+        indexes = [
+            models.Index(
+                fields=['next_attempt_at'],
+                condition=Q(sent_at__isnull=True),
+                name='outbox_pending_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'Письмо {self.to}: {self.subject:.20}'
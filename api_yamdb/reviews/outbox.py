@@ -0,0 +1,200 @@
+"""Проект спринта 10: исходящая почта через таблицу OutboxEmail.
+
+Письмо записывается в таблицу в транзакции вызывающего кода, а
+отправляется обработчиком после фиксации, поэтому запрос не ждёт
+почтовый сервер и не отправляет письмо об откатившейся записи.
+
+Обработчик захватывает пачку писем одним условным UPDATE со своей
+меткой и сдвигом срока на время аренды: параллельный обработчик эти
+письма не получит, а письма упавшего обработчика вернутся в очередь по
+истечении аренды. Пачка отправляется через одно соединение с почтовым
+сервером. Неудачная попытка откладывает письмо с экспоненциально
+растущей паузой, после OUTBOX_MAX_ATTEMPTS попыток письмо остаётся
+в таблице с last_error и больше не отправляется.
+"""
+import logging
+import threading
+import time
+from datetime import timedelta
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import F
+from django.utils import timezone
+
+from .models import OutboxEmail
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_email(subject, body, to, from_email=None):
+    """Ставит письмо в очередь в текущей транзакции."""
+    return OutboxEmail.objects.create(
+        subject=subject,
+        body=body,
+        to=to,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+    )
+
+
+def get_retry_delay(attempts):
+    """Пауза перед следующей попыткой после attempts неудачных."""
+    return timedelta(seconds=min(
+        settings.OUTBOX_RETRY_DELAY * 2 ** (attempts - 1),
+        settings.OUTBOX_MAX_RETRY_DELAY,
+    ))
+
+
+def claim_batch(limit, now=None):
+    """Захватывает до limit писем, срок отправки которых наступил."""
+    now = now or timezone.now()
+    token = uuid4().hex
+    due = OutboxEmail.objects.filter(
+        sent_at__isnull=True, next_attempt_at__lte=now
+    )
+    batch = due.order_by('next_attempt_at').values('pk')[:limit]
+    # Условие повторяется во внешнем UPDATE: строку, которую успел
+    # захватить параллельный обработчик, UPDATE пропустит.
+    due.filter(pk__in=batch).update(
+        lease_token=token,
+        next_attempt_at=now + timedelta(seconds=settings.OUTBOX_LEASE),
+    )
+    return list(OutboxEmail.objects.filter(lease_token=token).order_by('pk'))
+
+
+def send_email(email, connection):
+    EmailMessage(
+        subject=email.subject,
+        body=email.body,
+        from_email=email.from_email,
+        to=[email.to],
+        connection=connection,
+    ).send()
+
+
+def mark_sent(emails, now=None):
+    return OutboxEmail.objects.filter(
+        pk__in=[email.pk for email in emails]
+    ).update(sent_at=now or timezone.now(), lease_token='')
+
+
+def mark_failed(email, error, now=None):
+    """Откладывает письмо до следующей попытки или прекращает попытки."""
+    now = now or timezone.now()
+    attempts = email.attempts + 1
+    next_attempt_at = None
+    if attempts < settings.OUTBOX_MAX_ATTEMPTS:
+        next_attempt_at = now + get_retry_delay(attempts)
+    logger.warning('Письмо %s не отправлено: %s', email.pk, error)
+    return OutboxEmail.objects.filter(pk=email.pk).update(
+        attempts=F('attempts') + 1,
+        next_attempt_at=next_attempt_at,
+        last_error=str(error),
+        lease_token='',
+    )
+
+
+def send_batch(emails):
+    """Отправляет захваченные письма через одно соединение с сервером.
+
+    Возвращает (отправлено, с ошибкой).
+    """
+    sent, failed = [], []
+    try:
+        with get_connection() as connection:
+            for email in emails:
+                try:
+                    send_email(email, connection)
+                except Exception as error:
+                    mark_failed(email, error)
+                    failed.append(email)
+                else:
+                    sent.append(email)
+    except Exception as error:
+        # Соединение не открылось или оборвалось: оставшиеся письма
+        # ждут повтора.
+        for email in emails[len(sent) + len(failed):]:
+            mark_failed(email, error)
+            failed.append(email)
+    mark_sent(sent)
+    return len(sent), len(failed)
+
+
+class OutboxDispatcher:
+    """Отправка очереди пачками по batch_size писем на соединение.
+
+    В режиме опроса очередь проверяется раз в flush_interval секунд.
+    stats копит число отправленных писем и время отправки для метрики
+    «писем в секунду».
+    """
+
+    def __init__(self, batch_size=None, flush_interval=None):
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self.lock = threading.Lock()
+        self.stats = {'sent': 0, 'failed': 0, 'batches': 0, 'seconds': 0.0}
+
+    @property
+    def batch_size(self):
+        return self._batch_size or settings.OUTBOX_BATCH_SIZE
+
+    @property
+    def flush_interval(self):
+        if self._flush_interval is None:
+            return settings.OUTBOX_FLUSH_INTERVAL
+        return self._flush_interval
+
+    def get_rate(self):
+        """Писем в секунду за всё время отправки."""
+        with self.lock:
+            seconds = self.stats['seconds']
+            return self.stats['sent'] / seconds if seconds else 0.0
+
+    def get_stats(self):
+        with self.lock:
+            stats = dict(self.stats)
+        return {**stats, 'rate': self.get_rate()}
+
+    def drain(self):
+        """Отправляет все письма, срок которых наступил.
+
+        Возвращает (отправлено, с ошибкой).
+        """
+        sent = failed = 0
+        while True:
+            emails = claim_batch(self.batch_size)
+            if not emails:
+                return sent, failed
+            started = time.monotonic()
+            batch_sent, batch_failed = send_batch(emails)
+            seconds = time.monotonic() - started
+            with self.lock:
+                self.stats['sent'] += batch_sent
+                self.stats['failed'] += batch_failed
+                self.stats['batches'] += 1
+                self.stats['seconds'] += seconds
+            logger.info(
+                'Отправлено писем: %s из %s за %.3f с',
+                batch_sent, len(emails), seconds
+            )
+            sent += batch_sent
+            failed += batch_failed
+
+    def run(self, once=False, report=None):
+        """Отправляет очередь раз в flush_interval секунд."""
+        while True:
+            sent, failed = self.drain()
+            if report is not None and (sent or failed):
+                report(sent, failed, self.get_rate())
+            if once:
+                return
+            time.sleep(self.flush_interval)
+
+
+dispatcher = OutboxDispatcher()
+
+
+def drain_outbox():
+    """Отправляет письма, срок которых наступил, общим обработчиком."""
+    return dispatcher.drain()
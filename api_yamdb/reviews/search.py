@@ -0,0 +1,95 @@
+"""Полнотекстовый индекс произведений на SQLite FTS5.
+
+Индекс reviews_title_fts хранит только токены названия и описания
+(external content), строки берутся из reviews_title по rowid = id.
+Синхронизацию при записи выполняют триггеры базы данных, поэтому индекс
+не отстаёт ни при сохранении через ORM, ни при загрузке data_load.py.
+"""
+import re
+
+TITLE_FTS_TABLE = 'reviews_title_fts'
+
+TITLE_FTS_SQL = (
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {TITLE_FTS_TABLE} USING fts5(
+        name, description,
+        content='reviews_title', content_rowid='id',
+        tokenize='unicode61'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {TITLE_FTS_TABLE}_ai
+    AFTER INSERT ON reviews_title BEGIN
+        INSERT INTO {TITLE_FTS_TABLE}(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {TITLE_FTS_TABLE}_ad
+    AFTER DELETE ON reviews_title BEGIN
+        INSERT INTO {TITLE_FTS_TABLE}({TITLE_FTS_TABLE}, rowid, name,
+                                      description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {TITLE_FTS_TABLE}_au
+    AFTER UPDATE OF name, description ON reviews_title BEGIN
+        INSERT INTO {TITLE_FTS_TABLE}({TITLE_FTS_TABLE}, rowid, name,
+                                      description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO {TITLE_FTS_TABLE}(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+)
+
+TITLE_FTS_REBUILD_SQL = (
+    f"INSERT INTO {TITLE_FTS_TABLE}({TITLE_FTS_TABLE}) VALUES ('rebuild')"
+)
+
+
+def supports_full_text_search(connection):
+    return connection.vendor == 'sqlite'
+
+
+def install_title_search(connection, rebuild=False):
+    """Создаёт индекс и триггеры, если их ещё нет.
+
+    Вызывается миграцией и после каждого migrate: SQLite пересоздаёт
+    таблицу при изменении её схемы, и триггеры старой таблицы теряются.
+    """
+    if not supports_full_text_search(connection):
+        return
+    with connection.cursor() as cursor:
+        if 'reviews_title' not in connection.introspection.table_names(cursor):
+            return
+        for statement in TITLE_FTS_SQL:
+            cursor.execute(statement)
+        if rebuild:
+            cursor.execute(TITLE_FTS_REBUILD_SQL)
+
+
+def uninstall_title_search(connection):
+    if not supports_full_text_search(connection):
+        return
+    with connection.cursor() as cursor:
+        for suffix in ('ai', 'ad', 'au'):
+            cursor.execute(
+                f'DROP TRIGGER IF EXISTS {TITLE_FTS_TABLE}_{suffix}'
+            )
+        cursor.execute(f'DROP TABLE IF EXISTS {TITLE_FTS_TABLE}')
+
+
+def build_match_query(text, columns=None):
+    """Превращает пользовательскую строку в выражение MATCH.
+
+    Каждое слово ищется как префикс, все слова обязательны. Слова берутся
+    в кавычки, чтобы символы синтаксиса FTS5 из запроса не исполнялись.
+    """
+    words = re.findall(r'\w+', text)
+    if columns:
+        return ' AND '.join(
+            '{%s} : "%s"*' % (' '.join(columns), word) for word in words
+        )
+    return ' '.join(f'"{word}"*' for word in words)
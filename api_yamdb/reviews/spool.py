@@ -0,0 +1,190 @@
+"""Проект спринта 10: почтовый спул из сегментов вместо файла на письмо.
+
+Письма дописываются в конец текущего сегмента segment-NNNNNN.log; когда
+сегмент превышает EMAIL_SPOOL_SEGMENT_SIZE байт, начинается следующий.
+Запись письма — строка с его длиной в байтах и само письмо. В index.log
+на каждого получателя дописывается строка «получатель, сегмент, смещение,
+длина, время», по которой письмо читается одним seek без перебора файлов.
+
+Очистка удаляет сегменты старше EMAIL_SPOOL_RETENTION дней и сегменты,
+все письма которых заменены более поздними письмами тем же получателям,
+и переписывает индекс без ссылок на удалённые сегменты.
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+from email import message_from_bytes
+from pathlib import Path
+
+from django.conf import settings
+from django.core.mail.backends.base import BaseEmailBackend
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: запись из нескольких процессов не синхронизируется.
+    fcntl = None
+
+SEGMENT_NAME = 'segment-{:06d}.log'
+INDEX_NAME = 'index.log'
+LOCK_NAME = 'spool.lock'
+
+
+class MailSpool:
+    """Сегменты спула и индекс по получателям в каталоге path."""
+
+    lock = threading.Lock()
+
+    def __init__(self, path=None, segment_size=None):
+        self.path = Path(path or settings.EMAIL_SPOOL_PATH)
+        self.segment_size = (
+            segment_size or settings.EMAIL_SPOOL_SEGMENT_SIZE
+        )
+
+    @contextmanager
+    def locked(self):
+        """Блокировка спула для потоков и процессов на время записи."""
+        self.path.mkdir(parents=True, exist_ok=True)
+        with self.lock, open(self.path / LOCK_NAME, 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def get_segments(self):
+        """Номера сегментов по возрастанию."""
+        return sorted(
+            int(path.stem.split('-')[1])
+            for path in self.path.glob('segment-*.log')
+        )
+
+    def get_segment_path(self, number):
+        return self.path / SEGMENT_NAME.format(number)
+
+    def get_active_segment(self, size):
+        """Сегмент, в который помещается запись размером size байт."""
+        segments = self.get_segments()
+        if not segments:
+            return 1
+        number = segments[-1]
+        current = self.get_segment_path(number).stat().st_size
+        if current and current + size > self.segment_size:
+            return number + 1
+        return number
+
+    def append(self, messages):
+        """Дописывает пары (получатели, байты письма) в спул."""
+        now = time.time()
+        with self.locked():
+            index = []
+            with open(self.path / INDEX_NAME, 'a') as index_file:
+                for recipients, data in messages:
+                    record = b'%d\n' % len(data) + data
+                    number = self.get_active_segment(len(record))
+                    with open(self.get_segment_path(number), 'ab') as segment:
+                        offset = segment.seek(0, os.SEEK_END)
+                        segment.write(record)
+                    header = offset + len(record) - len(data)
+                    index.extend(
+                        f'{recipient}\t{number}\t{header}\t{len(data)}'
+                        f'\t{now:.3f}\n'
+                        for recipient in recipients
+                    )
+                index_file.writelines(index)
+
+    def read_index(self):
+        """Записи индекса: (получатель, сегмент, смещение, длина, время)."""
+        try:
+            index_file = open(self.path / INDEX_NAME)
+        except FileNotFoundError:
+            return
+        with index_file:
+            for line in index_file:
+                recipient, number, offset, length, sent_at = (
+                    line.rstrip('\n').split('\t')
+                )
+                yield (recipient, int(number), int(offset), int(length),
+                       float(sent_at))
+
+    def read(self, number, offset, length):
+        with open(self.get_segment_path(number), 'rb') as segment:
+            segment.seek(offset)
+            return message_from_bytes(segment.read(length))
+
+    def lookup(self, recipient, latest=True):
+        """Письма получателю от старых к новым или только последнее."""
+        recipient = recipient.lower()
+        entries = [
+            entry for entry in self.read_index()
+            if entry[0].lower() == recipient
+        ]
+        if latest:
+            entries = entries[-1:]
+        return [self.read(*entry[1:4]) for entry in entries]
+
+    def get_removable_segments(self, now):
+        """Сегменты, которые удаляет очистка; текущий сегмент не удаляется.
+
+        Сегмент удаляется, если он старше срока хранения или если для
+        каждого его письма есть более позднее письмо тому же получателю.
+        """
+        segments = self.get_segments()[:-1]
+        expire_before = now - settings.EMAIL_SPOOL_RETENTION * 24 * 60 * 60
+        removable = {
+            number for number in segments
+            if self.get_segment_path(number).stat().st_mtime < expire_before
+        }
+        latest = {}
+        for recipient, number, *_ in self.read_index():
+            latest[recipient.lower()] = number
+        live = set(latest.values())
+        return removable | {
+            number for number in segments if number not in live
+        }
+
+    def compact(self, now=None):
+        """Удаляет устаревшие сегменты и переписывает индекс.
+
+        Возвращает номера удалённых сегментов.
+        """
+        now = now or time.time()
+        with self.locked():
+            removed = self.get_removable_segments(now)
+            index_path = self.path / INDEX_NAME
+            compacted = self.path / f'{INDEX_NAME}.tmp'
+            with open(compacted, 'w') as index_file:
+                index_file.writelines(
+                    '\t'.join(map(str, entry[:4])) + f'\t{entry[4]:.3f}\n'
+                    for entry in self.read_index()
+                    if entry[1] not in removed
+                )
+            os.replace(compacted, index_path)
+            for number in removed:
+                self.get_segment_path(number).unlink()
+        return sorted(removed)
+
+
+class SpoolEmailBackend(BaseEmailBackend):
+    """Почтовый бэкенд, дописывающий письма в спул MailSpool."""
+
+    def __init__(self, *args, spool_path=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.spool = MailSpool(spool_path)
+
+    def send_messages(self, email_messages):
+        messages = [
+            (message.recipients(), message.message().as_bytes())
+            for message in email_messages
+            if message.recipients()
+        ]
+        try:
+            self.spool.append(messages)
+        except OSError:
+            if not self.fail_silently:
+                raise
+            return 0
+        return len(messages)
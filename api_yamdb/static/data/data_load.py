@@ -4,6 +4,7 @@
 """
 import csv
 import sqlite3
+from datetime import datetime, timezone
 
 DEFAULT_CSV_PATH = ""
 DEFAULT_SQL_PATH = "../../db.sqlite3"
@@ -17,7 +18,24 @@ tables_queue = {
     "review.csv": "reviews_review",
     "comments.csv": "reviews_comment"
 }
-conn = sqlite3.connect(DEFAULT_SQL_PATH)
+# Значения служебных колонок, которых нет в CSV: счётчики, флаги, даты и
+# версия токенов должны иметь свой тип, иначе пересчёт и сохранение
+# моделей падают.
+MISSING_FIELD_DEFAULTS = {
+    "is_superuser": 0,
+    "is_staff": 0,
+    "is_active": 1,
+    "last_login": None,
+    "date_joined": datetime.now(timezone.utc).isoformat(),
+    "token_version": 0,
+    "score_sum": 0,
+    "review_count": 0,
+    "rating": None,
+    "comment_count": 0,
+    "last_comment_at": None,
+}
+# Соединение открывается в main(), чтобы модуль можно было импортировать.
+conn = None
 
 
 def load_csv(filename):
@@ -54,11 +72,13 @@ def clear_all_db():
         conn.commit()
 
 
-def data_prepare(data, add_field_count):
+def data_prepare(data, add_field_names):
     """Предварительная подготовка данных"""
     data_updated = []
     for row in data:
-        empty_list = ['_'] * add_field_count
+        empty_list = [
+            MISSING_FIELD_DEFAULTS.get(name, '_') for name in add_field_names
+        ]
         row_list = row + empty_list
         row_tuple = tuple(row_list)
         data_updated.append(row_tuple)
@@ -78,11 +98,10 @@ def data_save(table_name, csv_file_data):
     fields_names = csv_file_data['head'] + difference_names
 
     field_count = len(fields_names)
-    add_data_count = field_count - len(csv_file_data['head'])
     fields_names_template = ', '.join(fields_names)
     values_template = ', '.join(['?'] * field_count)
     insert_data = data_prepare(csv_file_data['data'],
-                               add_data_count)
+                               difference_names)
     sql_insert = (f'INSERT INTO {table_name} ({fields_names_template}) '
                   f'VALUES({values_template});')
     cur.executemany(sql_insert, insert_data)
@@ -94,6 +113,8 @@ def main():
         Скрипт выполняет загрузку данных из таблиц CSV в базу данных
         приложения API_YAMDB.
     """
+    global conn
+    conn = sqlite3.connect(DEFAULT_SQL_PATH)
     print(
         'Скрипт data_load.py выполняет загрузку данных из таблиц CSV'
         ' в базу данных приложения API_YAMDB.'
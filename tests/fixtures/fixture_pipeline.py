@@ -0,0 +1,8 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def sync_side_effects(settings):
+    # Побочные действия записи выполняются сразу после фиксации, чтобы
+    # тесты видели агрегаты без ожидания фоновых потоков.
+    settings.SIDE_EFFECTS_SYNC = True
@@ -0,0 +1,92 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_comments, create_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08RatingAggregates:
+
+    def test_01_rating_follows_review_changes(self, admin_client, admin,
+                                              user_client, user):
+        author_map = {admin: admin_client, user: user_client}
+        reviews, titles = create_reviews(admin_client, author_map)
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        review_url = title_url + 'reviews/{review_id}/'
+
+        response = user_client.patch(
+            review_url.format(review_id=reviews[1]['id']), data={'score': 9}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert admin_client.get(title_url).json()['rating'] == 7, (
+            'Проверьте, что после изменения оценки отзыва рейтинг '
+            'произведения пересчитывается.'
+        )
+
+        response = admin_client.delete(
+            review_url.format(review_id=reviews[0]['id'])
+        )
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert admin_client.get(title_url).json()['rating'] == 9, (
+            'Проверьте, что после удаления отзыва рейтинг произведения '
+            'пересчитывается.'
+        )
+
+        user_client.delete(review_url.format(review_id=reviews[1]['id']))
+        assert admin_client.get(title_url).json()['rating'] is None, (
+            'Если у произведения не осталось отзывов - значением поля '
+            '`rating` должно быть `None`.'
+        )
+
+    def test_02_recalculate_ratings_command(self, admin_client, admin,
+                                            user_client, user):
+        from reviews.models import Title
+
+        author_map = {admin: admin_client, user: user_client}
+        _, titles = create_reviews(admin_client, author_map)
+        Title.objects.update(score_sum=0, review_count=0, rating=None)
+
+        call_command('recalculate_ratings', stdout=StringIO())
+
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.score_sum, title.review_count, title.rating) == (
+            10, 2, 5.0
+        ), (
+            'Проверьте, что команда `recalculate_ratings` восстанавливает '
+            'агрегаты рейтинга по таблице отзывов.'
+        )
+
+    def test_03_user_cascade_updates_aggregates(self, admin_client, admin,
+                                                user_client, user):
+        from reviews.models import Review, ScoreHistogram, Title
+
+        author_map = {admin: admin_client, user: user_client}
+        _, reviews, titles = create_comments(admin_client, author_map)
+        response = admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.score_sum, title.review_count, title.rating) == (
+            5, 1, 5.0
+        ), (
+            'Проверьте, что отзывы, удалённые вместе с пользователем, '
+            'вычитаются из агрегатов рейтинга.'
+        )
+        histogram = ScoreHistogram.objects.get(title_id=titles[0]['id'])
+        assert histogram.as_dict()['5'] == 1
+        assert Review.objects.get(pk=reviews[0]['id']).comment_count == 1, (
+            'Проверьте, что комментарии удалённого пользователя вычитаются '
+            'из счётчика комментариев отзыва.'
+        )
+
+        response = admin_client.delete(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/'
+        )
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        title.refresh_from_db()
+        assert (title.score_sum, title.review_count, title.rating) == (
+            0, 0, None
+        )
@@ -0,0 +1,196 @@
+from http import HTTPStatus
+
+import pytest
+
+# Максимальное число SQL-запросов на один анонимный GET к эндпоинту.
+# Бюджет не зависит от количества объектов на странице: превышение
+# означает, что в сериализаторе появился N+1.
+QUERY_BUDGET = {
+    '/api/v1/titles/': 3,
+    '/api/v1/titles/?cursor=&ordering=-rating': 2,
+    '/api/v1/titles/{title_id}/': 2,
+    '/api/v1/categories/': 2,
+    '/api/v1/genres/': 2,
+}
+
+OBJECTS_COUNT = 12
+
+
+@pytest.fixture
+def catalog():
+    from reviews.models import Category, Genre, GenreTitle, Title
+
+    categories = [
+        Category.objects.create(name=f'Категория {idx}', slug=f'cat-{idx}')
+        for idx in range(OBJECTS_COUNT)
+    ]
+    genres = [
+        Genre.objects.create(name=f'Жанр {idx}', slug=f'genre-{idx}')
+        for idx in range(OBJECTS_COUNT)
+    ]
+    titles = [
+        Title.objects.create(
+            name=f'Произведение {idx}',
+            year=1950 + idx,
+            category=categories[idx],
+        )
+        for idx in range(OBJECTS_COUNT)
+    ]
+    GenreTitle.objects.bulk_create(
+        GenreTitle(title=title, genre=genre)
+        for idx, title in enumerate(titles)
+        for genre in genres[idx:idx + 2]
+    )
+    return {'title_id': titles[0].id}
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09QueryBudget:
+
+    @pytest.mark.parametrize('url_pattern', QUERY_BUDGET)
+    def test_01_query_budget(self, client, catalog, url_pattern,
+                             django_assert_max_num_queries):
+        url = url_pattern.format(**catalog)
+        with django_assert_max_num_queries(QUERY_BUDGET[url_pattern]):
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает ответ со '
+            'статусом 200.'
+        )
+
+    def test_02_review_create_budget(self, user_client, catalog, user,
+                                     settings, django_assert_max_num_queries):
+        from api.pipeline import pipeline
+        from reviews.models import ScoreHistogram, Title
+
+        settings.SIDE_EFFECTS_SYNC = False
+        url = '/api/v1/titles/{title_id}/reviews/'.format(**catalog)
+        data = {'text': 'Отзыв', 'score': 7}
+        # Пользователь из токена, произведение, вставка отзыва.
+        # Рейтинг и гистограмма обновляются после ответа в фоне.
+        with django_assert_max_num_queries(4):
+            response = user_client.post(url, data=data)
+        assert response.status_code == HTTPStatus.CREATED
+        pipeline.flush()
+        title = Title.objects.get(pk=catalog['title_id'])
+        assert (title.review_count, title.rating) == (1, 7.0), (
+            'Проверьте, что рейтинг произведения обновляется фоновым '
+            'побочным действием после создания отзыва.'
+        )
+        assert ScoreHistogram.objects.get(title=title).score_7 == 1
+
+        with django_assert_max_num_queries(5):
+            response = user_client.post(url, data=data)
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Повторный отзыв пользователя к произведению должен '
+            'отклоняться ответом 400.'
+        )
+        assert 'non_field_errors' in response.json()
+
+    def test_03_nested_route_single_lookup(self, client, catalog, user,
+                                           django_assert_num_queries):
+        from reviews.models import Comment, Review, Title
+
+        title_id = catalog['title_id']
+        review = Review.objects.create(
+            title_id=title_id, author=user, text='Отзыв', score=5
+        )
+        for idx in range(3):
+            Comment.objects.create(
+                review=review, author=user, text=f'Комментарий {idx}'
+            )
+        url = f'/api/v1/titles/{title_id}/reviews/{review.id}/comments/'
+        # Произведение с отзывом одним JOIN-ом, COUNT и страница.
+        with django_assert_num_queries(3):
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['count'] == 3
+
+        other_title = Title.objects.exclude(id=title_id).first()
+        url = f'/api/v1/titles/{other_title.id}/reviews/{review.id}/comments/'
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что комментарии к отзыву, запрошенные через чужое '
+            'произведение, возвращают ответ со статусом 404.'
+        )
+
+    @pytest.mark.parametrize('url_pattern', (
+        '/api/v1/titles/{title_id}/reviews/',
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+    ))
+    def test_04_author_username_only(self, client, catalog, url_pattern,
+                                     django_user_model,
+                                     django_assert_num_queries):
+        from reviews.models import Comment, Review
+
+        authors = [
+            django_user_model.objects.create_user(
+                username=f'author{idx}', email=f'author{idx}@yamdb.fake',
+                bio='Длинная биография'
+            )
+            for idx in range(5)
+        ]
+        reviews = [
+            Review.objects.create(
+                title_id=catalog['title_id'], author=author, text='Отзыв',
+                score=5
+            )
+            for author in authors
+        ]
+        for author in authors:
+            Comment.objects.create(
+                review=reviews[0], author=author, text='Комментарий'
+            )
+        url = url_pattern.format(review_id=reviews[0].id, **catalog)
+        # Объекты маршрута, COUNT и страница с JOIN автора.
+        with django_assert_num_queries(3) as context:
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert {item['author'] for item in response.json()['results']} == {
+            author.username for author in authors
+        }
+        page_sql = context.captured_queries[-1]['sql']
+        assert '"reviews_customuser"."username"' in page_sql
+        for column in ('password', 'bio', 'email'):
+            assert f'"reviews_customuser"."{column}"' not in page_sql, (
+                f'Проверьте, что страница `{url_pattern}` читает из таблицы '
+                f'пользователей только username, без `{column}`.'
+            )
+
+    def test_05_author_permission_without_user_lookup(
+            self, user_client, catalog, user, django_assert_num_queries):
+        from reviews.models import Review
+
+        review = Review.objects.create(
+            title_id=catalog['title_id'], author=user, text='Отзыв', score=5
+        )
+        url = '/api/v1/titles/{title_id}/reviews/{review_id}/'.format(
+            review_id=review.id, **catalog
+        )
+        # Пользователь из токена, произведение, отзыв с JOIN автора, BEGIN,
+        # обновление отзыва.
+        with django_assert_num_queries(5) as context:
+            response = user_client.patch(url, data={'text': 'Исправлено'})
+        assert response.status_code == HTTPStatus.OK
+        user_queries = [
+            query for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+            and 'FROM "reviews_customuser"' in query['sql']
+        ]
+        assert len(user_queries) == 1, (
+            'Проверьте, что проверка авторства сравнивает author_id и не '
+            'загружает автора отдельным запросом.'
+        )
+
+    def test_06_other_integrity_errors_raised(self, user_client, catalog,
+                                              monkeypatch):
+        from django.db import IntegrityError
+        from reviews.models import Review
+
+        def save(*args, **kwargs):
+            raise IntegrityError('NOT NULL constraint failed')
+
+        monkeypatch.setattr(Review, 'save', save)
+        url = '/api/v1/titles/{title_id}/reviews/'.format(**catalog)
+        with pytest.raises(IntegrityError):
+            user_client.post(url, data={'text': 'Отзыв', 'score': 7})
@@ -0,0 +1,157 @@
+import json
+from base64 import urlsafe_b64encode
+from http import HTTPStatus
+from urllib.parse import quote
+
+import pytest
+
+TITLES_COUNT = 23
+
+
+@pytest.fixture
+def titles():
+    from reviews.models import Category, Title
+
+    categories = [
+        Category.objects.create(name=f'Категория {idx}', slug=f'cat-{idx}')
+        for idx in range(3)
+    ]
+    for idx in range(TITLES_COUNT):
+        Title.objects.create(
+            name=f'Произведение {idx % 7}',
+            year=1990 + idx % 5,
+            category=categories[idx % 3] if idx % 4 else None,
+        )
+    for idx, title in enumerate(Title.objects.all()):
+        if idx % 3:
+            Title.objects.apply_review_delta(title.id, idx % 4 + 1, 1)
+
+
+def walk(client, url, link='next'):
+    ids = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает ответ со '
+            'статусом 200.'
+        )
+        data = response.json()
+        assert 'count' not in data, (
+            'В режиме ?cursor= ответ не должен содержать ключ `count`.'
+        )
+        page = [title['id'] for title in data['results']]
+        ids = page + ids if link == 'previous' else ids + page
+        url = data[link]
+    return ids, data
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10TitleCursorPagination:
+
+    @pytest.mark.parametrize('ordering', (
+        None, 'name', '-name', 'year', '-year', 'rating', '-rating',
+        'category', '-category', 'year,-rating',
+    ))
+    def test_01_cursor_walk_matches_ordering(self, client, titles, ordering):
+        url = '/api/v1/titles/?cursor='
+        if ordering:
+            url += f'&ordering={ordering}'
+        expected_ids = self.expected_order(ordering)
+
+        ids, last_page = walk(client, url)
+        assert ids == expected_ids, (
+            'Проверьте, что обход `/api/v1/titles/?cursor=` по ссылкам '
+            f'`next` с сортировкой `{ordering}` выдаёт все произведения '
+            'по одному разу и в порядке сортировки.'
+        )
+        ids, _ = walk(client, last_page['previous'], link='previous')
+        assert ids == expected_ids[:-len(last_page['results'])], (
+            'Проверьте, что ссылки `previous` в режиме ?cursor= ведут '
+            'назад по тем же страницам.'
+        )
+
+    def test_02_page_clients_unaffected(self, client, titles):
+        response = client.get('/api/v1/titles/?page=2')
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert data['count'] == TITLES_COUNT and len(data['results']) == 10, (
+            'Проверьте, что запросы с `?page=` к `/api/v1/titles/` '
+            'по-прежнему обслуживаются постраничной пагинацией.'
+        )
+
+    def test_03_invalid_cursor(self, client, titles):
+        response = client.get('/api/v1/titles/?cursor=garbage')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+        first = client.get('/api/v1/titles/?cursor=&ordering=name').json()
+        response = client.get(
+            first['next'].replace('ordering=name', 'ordering=year')
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Курсор, выданный для одной сортировки, не должен приниматься '
+            'для другой.'
+        )
+
+    def test_04_category_ordering_same_in_both_modes(self, client):
+        from reviews.models import Category, Title
+
+        # Порядок id категорий обратен порядку их названий.
+        second = Category.objects.create(name='Б', slug='b')
+        first = Category.objects.create(name='А', slug='a')
+        Title.objects.create(name='ta', year=2000, category=second)
+        Title.objects.create(name='tb', year=2000, category=first)
+        page = client.get('/api/v1/titles/?ordering=category').json()
+        cursor, _ = walk(client, '/api/v1/titles/?cursor=&ordering=category')
+        assert [title['id'] for title in page['results']] == cursor, (
+            'Проверьте, что ?ordering=category сортирует одинаково в '
+            'постраничном режиме и в режиме ?cursor=.'
+        )
+
+    @pytest.mark.parametrize('value', ['abc', {'year': 1}, 10 ** 30])
+    def test_05_crafted_cursor_value(self, client, titles, value):
+        cursor = urlsafe_b64encode(json.dumps({
+            'o': [['year', False], ['id', False]], 'p': [value, 1],
+        }).encode()).decode()
+        response = client.get(f'/api/v1/titles/?cursor={cursor}&ordering=year')
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что курсор со значением не того типа отклоняется '
+            'ответом 404.'
+        )
+
+    def test_06_search_with_cursor(self, client, titles):
+        search = quote('Произведение')
+        response = client.get(f'/api/v1/titles/?search={search}&cursor=')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что поиск по релевантности в режиме ?cursor= '
+            'отклоняется ответом 400, а не теряет порядок релевантности.'
+        )
+        from reviews.models import Title
+
+        found = set(Title.objects.search('Произведение').values_list(
+            'id', flat=True
+        ))
+        ids, _ = walk(
+            client, f'/api/v1/titles/?search={search}&ordering=year&cursor='
+        )
+        assert found and ids == [
+            pk for pk in self.expected_order('year') if pk in found
+        ]
+
+    @staticmethod
+    def expected_order(ordering):
+        """Порядок сортировки с NULL в роли наименьшего значения и id."""
+        from reviews.models import Title
+
+        rows = sorted(
+            Title.objects.values('id', 'name', 'year', 'rating',
+                                 'category_id'),
+            key=lambda row: row['id']
+        )
+        for term in reversed((ordering or '').split(',')):
+            if not term:
+                continue
+            field = term.lstrip('-').replace('category', 'category_id')
+            rows.sort(
+                key=lambda row: (row[field] is not None, row[field] or 0),
+                reverse=term.startswith('-'),
+            )
+        return [row['id'] for row in rows]
@@ -0,0 +1,77 @@
+from http import HTTPStatus
+
+import pytest
+
+
+@pytest.fixture
+def titles():
+    from reviews.models import Title
+
+    return {
+        'river': Title.objects.create(
+            name='Мост через реку Квай', year=1957,
+            description='Военная драма о строительстве моста.'
+        ),
+        'bridge': Title.objects.create(
+            name='Мосты округа Мэдисон', year=1995,
+            description='Фотограф и фермерша.'
+        ),
+        'nut': Title.objects.create(
+            name='Крепкий орешек', year=1988,
+            description='Полицейский против террористов в небоскрёбе.'
+        ),
+    }
+
+
+def found_ids(client, url):
+    response = client.get(url)
+    assert response.status_code == HTTPStatus.OK, (
+        f'Проверьте, что GET-запрос к `{url}` возвращает ответ со статусом '
+        '200.'
+    )
+    return [title['id'] for title in response.json()['results']]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11TitleSearch:
+
+    def test_01_search_is_ranked(self, client, titles):
+        ids = found_ids(client, '/api/v1/titles/?search=мост')
+        assert ids == [titles['river'].id, titles['bridge'].id], (
+            'Проверьте, что `?search=` ищет по префиксам слов названия и '
+            'описания и упорядочивает результаты по релевантности.'
+        )
+        ids = found_ids(client, '/api/v1/titles/?search=КРЕПКИЙ, ореш...')
+        assert ids == [titles['nut'].id], (
+            'Проверьте, что поиск не зависит от регистра и знаков '
+            'препинания в запросе.'
+        )
+        assert found_ids(client, '/api/v1/titles/?search=")*') == [], (
+            'Запрос без слов не должен находить произведения.'
+        )
+
+    def test_02_name_filter_ignores_description(self, client, titles):
+        ids = found_ids(client, '/api/v1/titles/?name=террористов')
+        assert ids == [], (
+            'Проверьте, что фильтр `?name=` ищет только по названию.'
+        )
+        ids = found_ids(client, '/api/v1/titles/?name=мост&search=драма')
+        assert ids == [titles['river'].id], (
+            'Проверьте, что `?name=` и `?search=` можно использовать вместе.'
+        )
+
+    def test_03_index_follows_writes(self, client, titles):
+        from reviews.models import Title
+
+        title = titles['nut']
+        title.name = 'Гарри Поттер'
+        title.save()
+        assert found_ids(client, '/api/v1/titles/?search=орешек') == []
+        assert found_ids(client, '/api/v1/titles/?search=поттер') == [
+            title.id
+        ], 'Проверьте, что индекс поиска обновляется при изменении названия.'
+
+        Title.objects.filter(pk=titles['bridge'].id).delete()
+        assert found_ids(client, '/api/v1/titles/?search=мост') == [
+            titles['river'].id
+        ], 'Проверьте, что удалённые произведения пропадают из поиска.'
@@ -0,0 +1,70 @@
+from http import HTTPStatus
+
+import pytest
+
+YEARS = (1979, 1980, 1984, 1989, 1990, 2001)
+
+
+@pytest.fixture
+def titles():
+    from reviews.models import Title
+
+    return {
+        year: Title.objects.create(name=f'Произведение {year}', year=year).id
+        for year in YEARS
+    }
+
+
+def found_years(client, query):
+    url = f'/api/v1/titles/?{query}'
+    response = client.get(url)
+    assert response.status_code == HTTPStatus.OK, (
+        f'Проверьте, что GET-запрос к `{url}` возвращает ответ со статусом '
+        '200.'
+    )
+    return sorted(title['year'] for title in response.json()['results'])
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12TitleYearFilter:
+
+    @pytest.mark.parametrize('query, expected', (
+        ('year=1984', [1984]),
+        ('year=198', []),
+        ('year_min=1984&year_max=1990', [1984, 1989, 1990]),
+        ('year_min=1990', [1990, 2001]),
+        ('decade=1980', [1980, 1984, 1989]),
+        ('decade=1987', [1980, 1984, 1989]),
+        ('year_contains=198', [1980, 1984, 1989]),
+    ))
+    def test_01_year_filters(self, client, titles, query, expected):
+        assert found_years(client, query) == expected, (
+            f'Проверьте, что фильтр `?{query}` для `/api/v1/titles/` '
+            'сравнивает год выпуска как целое число.'
+        )
+
+    def test_02_year_range_uses_index(self, titles):
+        from django.db import connection
+        from reviews.models import Title
+
+        queryset = Title.objects.filter(year__gte=1980, year__lt=1990)
+        sql, params = queryset.values('id').query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            plan = ' '.join(str(row[-1]) for row in cursor.fetchall())
+        assert 'title_year_id_idx' in plan and 'year>' in plan, (
+            'Проверьте, что фильтрация по диапазону лет выполняется '
+            f'поиском по индексу, а не полным просмотром. План: {plan}'
+        )
+
+    @pytest.mark.parametrize('query', (
+        'decade=1e20', 'decade=99999999999999999999', 'year=1e20',
+        'year_min=99999999999999999999', 'year_max=-99999999999999999999',
+        'decade=1985.5',
+    ))
+    def test_03_invalid_year(self, client, titles, query):
+        response = client.get(f'/api/v1/titles/?{query}')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            f'Проверьте, что фильтр `?{query}` для `/api/v1/titles/` '
+            'принимает только целый год и отвечает 400 на другие значения.'
+        )
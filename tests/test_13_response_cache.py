@@ -0,0 +1,141 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_single_review, create_titles
+
+
+def get(client, url):
+    response = client.get(url)
+    assert response.status_code == HTTPStatus.OK, (
+        f'Проверьте, что GET-запрос к `{url}` возвращает ответ со статусом '
+        '200.'
+    )
+    return response
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13ResponseCache:
+
+    def test_01_anonymous_reads_are_cached(self, client, admin_client,
+                                           django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        assert get(client, url)['X-Cache'] == 'MISS'
+        with django_assert_num_queries(0):
+            response = get(client, url)
+        assert response['X-Cache'] == 'HIT', (
+            'Проверьте, что повторный анонимный GET-запрос к '
+            f'`{url}` обслуживается из кэша без запросов к базе данных.'
+        )
+        assert get(client, url + '?format=json')['X-Cache'] == 'MISS', (
+            'Ключ кэша должен учитывать query string.'
+        )
+        assert 'X-Cache' not in get(admin_client, url), (
+            'Запросы с заголовком Authorization не должны кэшироваться.'
+        )
+
+    def test_02_writes_invalidate_tags(self, client, admin_client,
+                                       user_client):
+        titles, categories, genres = create_titles(admin_client)
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        get(client, title_url)
+        get(client, '/api/v1/genres/')
+
+        create_single_review(user_client, titles[0]['id'], 'Отлично', 9)
+        response = get(client, title_url)
+        assert response.json()['rating'] == 9, (
+            'Проверьте, что новый отзыв сбрасывает кэш произведения и '
+            'рейтинг не устаревает.'
+        )
+        assert get(client, '/api/v1/genres/')['X-Cache'] == 'HIT', (
+            'Отзыв не должен сбрасывать кэш жанров.'
+        )
+
+        admin_client.delete(f'/api/v1/genres/{genres[0]["slug"]}/')
+        assert genres[0] not in get(client, '/api/v1/genres/').json()[
+            'results'
+        ], 'Проверьте, что удаление жанра сбрасывает кэш списка жанров.'
+        assert genres[0] not in get(client, title_url).json()['genre'], (
+            'Проверьте, что удаление жанра сбрасывает кэш произведений.'
+        )
+
+    def test_03_stats(self, client, admin_client, user_client):
+        get(client, '/api/v1/categories/')
+        get(client, '/api/v1/categories/')
+        response = user_client.get('/api/v1/cache-stats/')
+        assert response.status_code == HTTPStatus.FORBIDDEN
+        assert get(admin_client, '/api/v1/cache-stats/').json() == {
+            'hits': 1, 'misses': 1, 'hit_ratio': 0.5
+        }, (
+            'Проверьте, что `/api/v1/cache-stats/` возвращает счётчики '
+            'попаданий и промахов кэша.'
+        )
+
+    def test_04_shared_cache_required(self, settings):
+        from api.checks import check_response_cache
+
+        assert check_response_cache(None) == []
+        settings.RESPONSE_CACHE_SINGLE_PROCESS = False
+        errors = check_response_cache(None)
+        assert [error.id for error in errors] == ['api.E002'], (
+            'Проверьте, что кэш в памяти процесса для RESPONSE_CACHE_ALIAS '
+            'допускается только при RESPONSE_CACHE_SINGLE_PROCESS.'
+        )
+        settings.RESPONSE_CACHE_ALIAS = 'missing'
+        assert [error.id for error in check_response_cache(None)] == [
+            'api.E001'
+        ]
+
+    def test_05_cascade_bumps_each_tag_once(self, admin_client, monkeypatch):
+        from api import cache
+        from reviews.models import CustomUser, Review, Title
+
+        title = Title.objects.create(name='Произведение', year=2000)
+        authors = CustomUser.objects.bulk_create(
+            CustomUser(username=f'author{idx}', email=f'a{idx}@yamdb.fake')
+            for idx in range(30)
+        )
+        Review.objects.bulk_create(
+            Review(title=title, author=author, text='Отзыв', score=5)
+            for author in CustomUser.objects.filter(
+                username__in=[author.username for author in authors]
+            )
+        )
+        bumped = []
+        increment = cache.increment
+
+        def record(key, *args, **kwargs):
+            bumped.append(key)
+            return increment(key, *args, **kwargs)
+
+        monkeypatch.setattr(cache, 'increment', record)
+        response = admin_client.delete(f'/api/v1/titles/{title.id}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert sorted(bumped) == sorted(
+            cache.TAG_KEY.format(tag)
+            for tag in ('title', f'reviews-{title.id}', 'review')
+        ), (
+            'Проверьте, что каскадное удаление сбрасывает каждый тег кэша '
+            'ответов один раз после фиксации транзакции.'
+        )
+
+    def test_06_tags_after_rollback(self, monkeypatch):
+        from django.db import transaction
+
+        from api import cache
+
+        bumped = []
+        monkeypatch.setattr(
+            cache, 'increment', lambda key, *args, **kwargs: bumped.append(key)
+        )
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                cache.invalidate_tags('title')
+                raise RuntimeError
+        with transaction.atomic():
+            cache.invalidate_tags('genre')
+        assert bumped == [cache.TAG_KEY.format('genre')], (
+            'Проверьте, что теги отменённой транзакции не сбрасываются, '
+            'а теги следующей транзакции сбрасываются.'
+        )
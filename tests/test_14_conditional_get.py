@@ -0,0 +1,99 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_comments, create_single_review
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14ConditionalGet:
+
+    @pytest.mark.parametrize('url_template', (
+        '/api/v1/titles/',
+        '/api/v1/titles/{title_id}/',
+        '/api/v1/titles/{title_id}/reviews/',
+        '/api/v1/titles/{title_id}/reviews/{review_id}/',
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+        '{comment_id}/',
+    ))
+    def test_01_not_modified(self, client, admin_client, admin,
+                             user_client, url_template,
+                             django_assert_num_queries):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client}
+        )
+        url = url_template.format(
+            title_id=titles[0]['id'], review_id=reviews[0]['id'],
+            comment_id=comments[0]['id']
+        )
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        etag = response.get('ETag')
+        last_modified = response.get('Last-Modified')
+        assert etag and last_modified, (
+            f'Проверьте, что ответ на GET-запрос к `{url_template}` '
+            'содержит заголовки `ETag` и `Last-Modified`.'
+        )
+
+        with django_assert_num_queries(0):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что GET-запрос к `{url_template}` с совпадающим '
+            '`If-None-Match` возвращает ответ 304 без запросов к базе.'
+        )
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+        create_single_review(user_client, titles[0]['id'], 'Новый', 7)
+        admin_client.post(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}'
+            '/comments/', data={'text': 'Новый комментарий'}
+        )
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что после изменения данных GET-запрос к '
+            f'`{url_template}` со старым `ETag` возвращает ответ 200.'
+        )
+        assert response['ETag'] != etag
+
+    def test_02_etag_is_scoped_to_title(self, client, admin_client, admin,
+                                        user_client):
+        _, reviews, titles = create_comments(
+            admin_client, {admin: admin_client}
+        )
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        etag = client.get(url)['ETag']
+        create_single_review(user_client, titles[1]['id'], 'Другое', 3)
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Отзыв к другому произведению не должен менять `ETag` списка '
+            'отзывов.'
+        )
+
+    def test_03_etag_survives_signup(self, client, admin_client, admin,
+                                     user, user_client):
+        _, _, titles = create_comments(
+            admin_client, {admin: admin_client}
+        )
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        etag = client.get(url)['ETag']
+        response = client.post('/api/v1/auth/signup/', data={
+            'username': 'newcomer', 'email': 'newcomer@yamdb.fake',
+        })
+        assert response.status_code == HTTPStatus.OK
+        user_client.patch('/api/v1/users/me/', data={'bio': 'Новое'})
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Регистрация и правка профиля не должны менять `ETag` списка '
+            'отзывов.'
+        )
+
+        response = admin_client.patch(
+            f'/api/v1/users/{admin.username}/', data={'username': 'renamed'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Смена имени автора должна менять `ETag` списка отзывов.'
+        )
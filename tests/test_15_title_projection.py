@@ -0,0 +1,75 @@
+from collections import OrderedDict
+
+import pytest
+from rest_framework.renderers import JSONRenderer
+
+
+@pytest.fixture
+def catalog():
+    from reviews.models import Category, Genre, GenreTitle, Title
+
+    category = Category.objects.create(name='Фильм', slug='films')
+    genres = [
+        Genre.objects.create(name=name, slug=slug)
+        for name, slug in (('Драма', 'drama'), ('Ужасы', 'horror'),
+                           ('Драма', 'drama-2'), ('Комедия', 'comedy'))
+    ]
+    titles = [
+        Title.objects.create(name='Без жанра и категории', year=1990),
+        Title.objects.create(
+            name='Полный "набор" — ёлки', year=2001, category=category,
+            description='Строка с \\ и\nпереводом строки'
+        ),
+        Title.objects.create(name='Один жанр', year=1970, category=category),
+    ]
+    for genre in reversed(genres):
+        GenreTitle.objects.create(title=titles[1], genre=genre)
+    GenreTitle.objects.create(title=titles[2], genre=genres[1])
+    Title.objects.apply_review_delta(titles[1].id, 14, 3)
+    Title.objects.apply_review_delta(titles[2].id, 10, 1)
+    return titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15TitleProjection:
+
+    def test_01_projection_matches_serializer(self, catalog):
+        from api.projections import TitleProjection
+        from api.querysets import optimize_for_serializer
+        from api.serializers import TitleGetSerializer
+        from reviews.models import Title
+
+        queryset = Title.objects.order_by('id')
+        expected = JSONRenderer().render(
+            TitleGetSerializer(
+                optimize_for_serializer(queryset, TitleGetSerializer),
+                many=True
+            ).data
+        )
+        rows = list(TitleProjection.get_queryset(queryset))
+        assert JSONRenderer().render(TitleProjection.project(rows)) == (
+            expected
+        ), (
+            'Проекция списка произведений должна давать JSON, побайтно '
+            'совпадающий с результатом TitleGetSerializer.'
+        )
+
+    def test_02_list_endpoint_matches_serializer(self, client, catalog):
+        from api.querysets import optimize_for_serializer
+        from api.serializers import TitleGetSerializer
+        from reviews.models import Title
+
+        response = client.get('/api/v1/titles/?ordering=-year',
+                              HTTP_ACCEPT='application/json')
+        expected = JSONRenderer().render(OrderedDict((
+            ('count', len(catalog)),
+            ('next', None),
+            ('previous', None),
+            ('results', TitleGetSerializer(optimize_for_serializer(
+                Title.objects.order_by('-year', 'id'), TitleGetSerializer
+            ), many=True).data),
+        )))
+        assert response.content == expected, (
+            'Проверьте, что ответ на GET-запрос к `/api/v1/titles/` '
+            'побайтно совпадает с ответом через TitleGetSerializer.'
+        )
@@ -0,0 +1,72 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_comments
+
+
+def get_with_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == HTTPStatus.OK, (
+        f'Проверьте, что GET-запрос к `{url}` возвращает ответ со статусом '
+        '200.'
+    )
+    return response.json(), ' '.join(
+        query['sql'] for query in context.captured_queries
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16SparseFieldsets:
+
+    def test_01_titles(self, client, admin_client, admin):
+        _, _, titles = create_comments(admin_client, {admin: admin_client})
+
+        data, sql = get_with_queries(
+            client, '/api/v1/titles/?fields=id,name,rating'
+        )
+        assert [list(title) for title in data['results']] == [
+            ['id', 'name', 'rating']
+        ] * len(titles), (
+            'Проверьте, что `?fields=` оставляет в ответе `/api/v1/titles/` '
+            'только перечисленные поля в исходном порядке.'
+        )
+        assert 'reviews_genre' not in sql and '"description"' not in sql, (
+            'Проверьте, что при `?fields=` без `genre` и `description` жанры '
+            'и описание не читаются из базы.'
+        )
+
+        data, sql = get_with_queries(
+            client, f'/api/v1/titles/{titles[0]["id"]}/?omit=genre,description'
+        )
+        assert list(data) == ['id', 'name', 'year', 'rating', 'category'], (
+            'Проверьте, что `?omit=` исключает поля из ответа '
+            '`/api/v1/titles/{title_id}/`.'
+        )
+        assert 'reviews_genre' not in sql and '"description"' not in sql
+
+    def test_02_reviews_and_comments(self, client, admin_client, admin):
+        _, reviews, titles = create_comments(
+            admin_client, {admin: admin_client}
+        )
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        data, sql = get_with_queries(client, url + '?fields=id,score')
+        assert data['results'] == [
+            {'id': review['id'], 'score': review['score']}
+            for review in reviews
+        ], (
+            f'Проверьте, что `?fields=` поддерживается для `{url}`.'
+        )
+        assert '"reviews_review"."text"' not in sql, (
+            'Проверьте, что текст отзыва не читается, если он не запрошен.'
+        )
+
+        url += f'{reviews[0]["id"]}/comments/'
+        data, sql = get_with_queries(client, url + '?omit=text,pub_date')
+        assert [list(comment) for comment in data['results']] == [
+            ['id', 'author']
+        ], f'Проверьте, что `?omit=` поддерживается для `{url}`.'
+        assert '"reviews_comment"."text"' not in sql
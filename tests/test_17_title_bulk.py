@@ -0,0 +1,87 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_categories, create_genre
+
+URL = '/api/v1/titles/bulk/'
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17TitleBulkCreate:
+
+    def test_01_permissions(self, client, user_client, moderator_client):
+        for role, api_client, expected in (
+            ('неавторизованного пользователя', client,
+             HTTPStatus.UNAUTHORIZED),
+            ('пользователя', user_client, HTTPStatus.FORBIDDEN),
+            ('модератора', moderator_client, HTTPStatus.FORBIDDEN),
+        ):
+            response = api_client.post(
+                URL, data='[]', content_type='application/json'
+            )
+            assert response.status_code == expected, (
+                f'Проверьте, что POST-запрос {role} к `{URL}` возвращает '
+                f'ответ со статусом {expected}.'
+            )
+
+    def test_02_bulk_create(self, admin_client,
+                            django_assert_max_num_queries):
+        from reviews.models import GenreTitle, Title
+
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        Title.objects.create(name='Уже есть', year=2000)
+        items = [
+            {
+                'name': f'Произведение {idx}',
+                'year': 1990 + idx,
+                'genre': [genres[idx % 3]['slug'], genres[2]['slug']],
+                'category': categories[idx % 2]['slug'],
+            }
+            for idx in range(20)
+        ]
+        items += [
+            {'name': 'Нет жанра', 'year': 2001, 'genre': ['missing'],
+             'category': categories[0]['slug']},
+            {'name': 'Уже есть', 'year': 2000, 'genre': [],
+             'category': categories[0]['slug']},
+            {'name': 'Из будущего', 'year': 3000, 'genre': [],
+             'category': 'missing'},
+            dict(items[0]),
+        ]
+        with django_assert_max_num_queries(10):
+            response = admin_client.post(URL, data=items, format='json')
+        assert response.status_code == HTTPStatus.CREATED, (
+            f'Проверьте, что POST-запрос администратора к `{URL}` с '
+            'корректными элементами возвращает ответ со статусом 201.'
+        )
+        data = response.json()
+        assert data['created'] == 20
+        results = data['results']
+        assert set(results[20]['errors']) == {'genre'}
+        assert set(results[21]['errors']) == {'non_field_errors'}
+        assert set(results[22]['errors']) == {'year'}
+        assert set(results[23]['errors']) == {'non_field_errors'}, (
+            'Проверьте, что повторы внутри пакета отклоняются.'
+        )
+
+        created = Title.objects.get(pk=results[4]['id'])
+        assert (created.name, created.category.slug) == (
+            items[4]['name'], items[4]['category']
+        )
+        assert set(
+            GenreTitle.objects.filter(title=created).values_list(
+                'genre__slug', flat=True
+            )
+        ) == set(items[4]['genre']), (
+            'Проверьте, что жанры созданных произведений привязаны.'
+        )
+        assert GenreTitle.objects.filter(
+            title_id=results[2]['id']
+        ).count() == 1, 'Повторяющийся жанр должен привязываться один раз.'
+
+        response = admin_client.get('/api/v1/titles/?search=Произведение')
+        assert response.json()['count'] == 20, (
+            'Созданные пакетом произведения должны находиться поиском.'
+        )
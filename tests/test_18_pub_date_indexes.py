@@ -0,0 +1,65 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+TEMP_SORT = 'USE TEMP B-TREE FOR ORDER BY'
+
+
+@pytest.fixture
+def thread(user, moderator):
+    from reviews.models import Comment, Review, Title
+
+    title = Title.objects.create(name='Произведение', year=2000)
+    reviews = [
+        Review.objects.create(
+            title=title, author=author, text=f'Отзыв {idx}', score=idx + 5
+        )
+        for idx, author in enumerate((user, moderator))
+    ]
+    for idx in range(3):
+        Comment.objects.create(
+            review=reviews[0], author=user, text=f'Комментарий {idx}'
+        )
+    return {'title_id': title.id, 'review_id': reviews[0].id}
+
+
+def get_page_plans(client, url):
+    """Планы SELECT-ов с ORDER BY, выполненных при запросе страницы."""
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == HTTPStatus.OK, (
+        f'Проверьте, что GET-запрос к `{url}` возвращает ответ со статусом '
+        '200.'
+    )
+    plans = []
+    with connection.cursor() as cursor:
+        for query in context.captured_queries:
+            if 'ORDER BY' not in query['sql']:
+                continue
+            cursor.execute('EXPLAIN QUERY PLAN ' + query['sql'])
+            plans.append([row[-1] for row in cursor.fetchall()])
+    return plans
+
+
+@pytest.mark.skipif(
+    connection.vendor != 'sqlite', reason='Проверяется план запроса SQLite.'
+)
+@pytest.mark.django_db(transaction=True)
+class Test18PubDateIndexes:
+
+    @pytest.mark.parametrize('url_pattern', (
+        '/api/v1/titles/{title_id}/reviews/',
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+        '/api/v1/titles/{title_id}/reviews/?cursor=',
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/?since=',
+    ))
+    def test_01_list_without_temp_sort(self, client, thread, url_pattern):
+        plans = get_page_plans(client, url_pattern.format(**thread))
+        assert plans, 'Страница списка должна читаться запросом с ORDER BY.'
+        for plan in plans:
+            assert not any(TEMP_SORT in step for step in plan), (
+                'Проверьте, что страница списка читается по составному '
+                f'индексу без сортировки во временном B-дереве: {plan}'
+            )
@@ -0,0 +1,153 @@
+from http import HTTPStatus
+
+import pytest
+
+COMMENTS_COUNT = 23
+
+
+@pytest.fixture
+def thread(user):
+    from reviews.models import Comment, Review, Title
+
+    title = Title.objects.create(name='Произведение', year=2000)
+    review = Review.objects.create(
+        title=title, author=user, text='Отзыв', score=5
+    )
+    for idx in range(COMMENTS_COUNT):
+        Comment.objects.create(
+            review=review, author=user, text=f'Комментарий {idx}'
+        )
+    # Группа комментариев с одной датой: порядок решает id.
+    first = Comment.objects.order_by('id').first()
+    Comment.objects.filter(id__in=range(first.id, first.id + 5)).update(
+        pub_date=first.pub_date
+    )
+    return {
+        'url': f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/',
+        'review': review,
+    }
+
+
+def get_page(client, url):
+    response = client.get(url)
+    assert response.status_code == HTTPStatus.OK, (
+        f'Проверьте, что GET-запрос к `{url}` возвращает ответ со статусом '
+        '200.'
+    )
+    return response.json()
+
+
+def walk(client, url):
+    ids = []
+    while url:
+        data = get_page(client, url)
+        ids += [comment['id'] for comment in data['results']]
+        url = data['next']
+    return ids
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19ThreadCursorPagination:
+
+    def test_01_cursor_walk(self, client, thread):
+        from reviews.models import Comment
+
+        expected_ids = list(Comment.objects.order_by(
+            '-pub_date', '-id'
+        ).values_list('id', flat=True))
+        assert walk(client, thread['url'] + '?cursor=') == expected_ids, (
+            'Проверьте, что обход комментариев по ссылкам `next` режима '
+            '?cursor= выдаёт все комментарии по одному разу от новых к '
+            'старым, а при равной дате — по убыванию id.'
+        )
+        data = get_page(client, thread['url'] + '?page=3')
+        assert [comment['id'] for comment in data['results']] == (
+            expected_ids[20:]
+        ), 'Постраничная выдача должна идти в том же порядке.'
+
+    def test_02_since_returns_only_new(self, client, user, thread):
+        from reviews.models import Comment
+
+        first_page = get_page(client, thread['url'] + '?cursor=')
+        since_url = first_page['since']
+        assert since_url and '?since=' in since_url, (
+            'Проверьте, что первая страница режима ?cursor= содержит ссылку '
+            '`since` для получения новых комментариев.'
+        )
+        data = get_page(client, since_url)
+        assert data['results'] == [] and data['next'], (
+            'Проверьте, что без новых комментариев лента ?since= пуста и '
+            'содержит ссылку `next` для следующего опроса.'
+        )
+
+        new_ids = [
+            Comment.objects.create(
+                review=thread['review'], author=user, text=f'Новый {idx}'
+            ).id
+            for idx in range(3)
+        ]
+        data = get_page(client, since_url)
+        assert [comment['id'] for comment in data['results']] == new_ids, (
+            'Проверьте, что лента ?since= возвращает только комментарии '
+            'новее курсора, от старых к новым.'
+        )
+        data = get_page(client, data['next'])
+        assert data['results'] == [], (
+            'Проверьте, что ссылка `next` ленты ?since= не повторяет уже '
+            'полученные комментарии.'
+        )
+
+    def test_03_since_page_size(self, client, thread):
+        from reviews.models import Comment
+
+        expected_ids = list(Comment.objects.order_by(
+            'pub_date', 'id'
+        ).values_list('id', flat=True))
+        ids, url = [], thread['url'] + '?since='
+        while True:
+            data = get_page(client, url)
+            if not data['results']:
+                break
+            assert len(data['results']) <= 10
+            ids += [comment['id'] for comment in data['results']]
+            url = data['next']
+        assert ids == expected_ids, (
+            'Проверьте, что пустой ?since= отдаёт обсуждение с начала '
+            'страницами, а ссылки `next` догоняют его без пропусков.'
+        )
+
+    def test_04_invalid_since(self, client, thread):
+        response = client.get(thread['url'] + '?since=garbage')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+        cursor_url = get_page(client, thread['url'] + '?cursor=')['next']
+        cursor = cursor_url.split('cursor=')[1]
+        response = client.get(thread['url'] + f'?since={cursor}')
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Курсор страниц не должен приниматься как курсор ленты ?since=.'
+        )
+
+    def test_05_reviews_since(self, client, thread, moderator):
+        from reviews.models import Review
+
+        title_id = thread['review'].title_id
+        url = f'/api/v1/titles/{title_id}/reviews/?cursor='
+        since_url = get_page(client, url)['since']
+        review = Review.objects.create(
+            title_id=title_id, author=moderator, text='Новый', score=7
+        )
+        data = get_page(client, since_url)
+        assert [item['id'] for item in data['results']] == [review.id], (
+            'Проверьте, что лента ?since= работает и для отзывов.'
+        )
+
+    def test_06_unknown_ordering_keeps_default(self, client, thread):
+        from reviews.models import Comment
+
+        expected_ids = list(Comment.objects.order_by(
+            '-pub_date', '-id'
+        ).values_list('id', flat=True))
+        url = thread['url'] + '?ordering=-text&cursor='
+        assert walk(client, url) == expected_ids, (
+            'Проверьте, что в режиме ?cursor= сортировка по недопустимому '
+            'полю заменяется сортировкой по умолчанию (-pub_date, -id).'
+        )
@@ -0,0 +1,154 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_comments
+
+
+def get_review_data(client, title_id, review_id):
+    response = client.get(f'/api/v1/titles/{title_id}/reviews/')
+    assert response.status_code == HTTPStatus.OK
+    return next(
+        review for review in response.json()['results']
+        if review['id'] == review_id
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20CommentStats:
+
+    def test_01_stats_follow_comments(self, client, admin_client, admin,
+                                      user_client, user):
+        from reviews.models import Comment
+
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        title_id, review_id = titles[0]['id'], reviews[0]['id']
+        review = get_review_data(client, title_id, review_id)
+        latest = Comment.objects.get(pk=comments[-1]['id'])
+        assert review['comment_count'] == 2, (
+            'Проверьте, что отзыв в ответе содержит поле `comment_count` '
+            'с количеством комментариев.'
+        )
+        assert review['last_comment_at'] == client.get(
+            f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+            f'{latest.id}/'
+        ).json()['pub_date'], (
+            'Проверьте, что поле `last_comment_at` отзыва содержит дату '
+            'последнего комментария.'
+        )
+        assert get_review_data(client, title_id, reviews[1]['id'])[
+            'comment_count'
+        ] == 0
+
+        url = f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+        response = user_client.delete(f'{url}{latest.id}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        review = get_review_data(client, title_id, review_id)
+        first = client.get(f'{url}{comments[0]["id"]}/').json()
+        assert (review['comment_count'], review['last_comment_at']) == (
+            1, first['pub_date']
+        ), (
+            'Проверьте, что после удаления комментария счётчик уменьшается, '
+            'а `last_comment_at` указывает на оставшийся последний '
+            'комментарий.'
+        )
+
+        admin_client.delete(f'{url}{comments[0]["id"]}/')
+        review = get_review_data(client, title_id, review_id)
+        assert (review['comment_count'], review['last_comment_at']) == (
+            0, None
+        )
+
+    def test_02_review_list_etag_changes(self, client, admin_client, admin):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client}
+        )
+        title_id, review_id = titles[0]['id'], reviews[0]['id']
+        url = f'/api/v1/titles/{title_id}/reviews/'
+        etag = client.get(url)['ETag']
+        admin_client.post(
+            f'{url}{review_id}/comments/', data={'text': 'Новый'}
+        )
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что новый комментарий делает устаревшим ETag '
+            'списка отзывов: в нём изменился `comment_count`.'
+        )
+
+    def test_03_recalculate_comment_stats(self, admin_client, admin,
+                                          user_client, user):
+        from reviews.models import Comment, Review
+
+        _, reviews, _ = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        Review.objects.update(comment_count=0, last_comment_at=None)
+
+        call_command('recalculate_comment_stats', stdout=StringIO())
+
+        review = Review.objects.get(pk=reviews[0]['id'])
+        last = Comment.objects.filter(review=review).latest('pub_date')
+        assert (review.comment_count, review.last_comment_at) == (
+            2, last.pub_date
+        ), (
+            'Проверьте, что команда `recalculate_comment_stats` '
+            'восстанавливает счётчики комментариев по таблице комментариев.'
+        )
+
+    def test_04_updates_keep_counters(self, admin_client, admin):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        _, reviews, titles = create_comments(
+            admin_client, {admin: admin_client}
+        )
+        title_id = titles[0]['id']
+        for url, data, counters in (
+            (f'/api/v1/titles/{title_id}/reviews/{reviews[0]["id"]}/',
+             {'text': 'Исправлено'}, ('comment_count', 'last_comment_at')),
+            (f'/api/v1/titles/{title_id}/',
+             {'name': 'Переименовано', 'genre': ['horror']},
+             ('score_sum', 'review_count', 'rating')),
+        ):
+            with CaptureQueriesContext(connection) as context:
+                response = admin_client.patch(url, data=data)
+            assert response.status_code == HTTPStatus.OK
+            updates = [
+                query['sql'] for query in context.captured_queries
+                if query['sql'].startswith('UPDATE')
+            ]
+            assert updates
+            for counter in counters:
+                assert not any(f'"{counter}" =' in sql for sql in updates), (
+                    f'Проверьте, что PATCH-запрос к `{url}` не перезаписывает '
+                    f'счётчик `{counter}`, который обновляется отдельно.'
+                )
+
+    def test_05_cascade_queries_do_not_grow(self, admin_client, admin,
+                                            user_client, user):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from reviews.models import Comment
+
+        _, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        query_counts = []
+        for review, comment_count in zip(reviews, (3, 40)):
+            Comment.objects.bulk_create(
+                Comment(review_id=review['id'], author=admin, text='Ещё')
+                for _ in range(comment_count)
+            )
+            with CaptureQueriesContext(connection) as context:
+                response = admin_client.delete(f'{url}{review["id"]}/')
+            assert response.status_code == HTTPStatus.NO_CONTENT
+            query_counts.append(len(context))
+        assert query_counts[0] == query_counts[1], (
+            'Проверьте, что число запросов при удалении отзыва не зависит '
+            'от числа его комментариев.'
+        )
@@ -0,0 +1,98 @@
+from http import HTTPStatus
+
+import pytest
+
+
+@pytest.fixture
+def threads(user, moderator, admin):
+    from reviews.models import Comment, Review, Title
+
+    title, other_title = (
+        Title.objects.create(name=f'Произведение {idx}', year=2000)
+        for idx in range(2)
+    )
+    reviews = [
+        Review.objects.create(
+            title=title, author=author, text='Отзыв', score=5
+        )
+        for author in (user, moderator, admin)
+    ]
+    foreign_review = Review.objects.create(
+        title=other_title, author=user, text='Отзыв', score=5
+    )
+    for review, count in zip(reviews + [foreign_review], (5, 1, 0, 2)):
+        for idx in range(count):
+            Comment.objects.create(
+                review=review, author=user, text=f'Комментарий {idx}'
+            )
+    return {
+        'url': f'/api/v1/titles/{title.id}/reviews/comments/',
+        'review_ids': [review.id for review in reviews],
+        'foreign_id': foreign_review.id,
+    }
+
+
+def latest_comment_ids(review_id, limit):
+    from reviews.models import Comment
+
+    return list(Comment.objects.filter(review_id=review_id).values_list(
+        'id', flat=True
+    )[:limit])
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21BatchComments:
+
+    def test_01_first_comments_per_review(self, client, threads,
+                                          django_assert_num_queries):
+        review_ids = threads['review_ids'] + [threads['foreign_id']]
+        url = (
+            f'{threads["url"]}?review_ids={",".join(map(str, review_ids))}'
+            '&limit=2'
+        )
+        # Произведение и все комментарии одним запросом с окном.
+        with django_assert_num_queries(2):
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает ответ со '
+            'статусом 200.'
+        )
+        data = response.json()
+        assert list(data) == [str(review_id) for review_id in review_ids]
+        for review_id in threads['review_ids']:
+            ids = [comment['id'] for comment in data[str(review_id)]]
+            assert ids == latest_comment_ids(review_id, 2), (
+                'Проверьте, что для каждого отзыва возвращаются первые '
+                '`limit` комментариев в порядке списка комментариев.'
+            )
+        assert data[str(threads['foreign_id'])] == [], (
+            'Комментарии к отзыву другого произведения не должны '
+            'возвращаться.'
+        )
+        assert set(data[str(threads['review_ids'][0])][0]) == {
+            'id', 'author', 'text', 'pub_date'
+        }
+
+    def test_02_default_limit(self, client, threads, settings):
+        review_id = threads['review_ids'][0]
+        data = client.get(f'{threads["url"]}?review_ids={review_id}').json()
+        assert len(data[str(review_id)]) == settings.BATCH_COMMENTS_LIMIT
+
+    @pytest.mark.parametrize('query', (
+        '', 'review_ids=', 'review_ids=1,x', 'review_ids=1&limit=0',
+        'review_ids=1&limit=x', 'review_ids=1&limit=1000',
+        'review_ids=99999999999999999999999', 'review_ids=1,-1',
+    ))
+    def test_03_invalid_params(self, client, threads, query):
+        response = client.get(f'{threads["url"]}?{query}')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            f'Проверьте, что запрос пакета комментариев с `?{query}` '
+            'возвращает ответ со статусом 400.'
+        )
+
+    def test_04_unknown_title(self, client, threads):
+        response = client.get(
+            f'/api/v1/titles/0/reviews/comments/'
+            f'?review_ids={threads["review_ids"][0]}'
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,108 @@
+from http import HTTPStatus
+
+import pytest
+
+TITLES_COUNT = 4
+
+
+@pytest.fixture
+def titles(user, moderator, admin):
+    from reviews.models import Review, Title
+
+    titles = [
+        Title.objects.create(name=f'Произведение {idx}', year=2000 + idx)
+        for idx in range(TITLES_COUNT)
+    ]
+    for title in titles[:-1]:
+        for score, author in enumerate((user, moderator, admin), 1):
+            Review.objects.create(
+                title=title, author=author, text='Отзыв', score=score
+            )
+    return [title.id for title in titles]
+
+
+def latest_review_ids(title_id, limit):
+    from reviews.models import Review
+
+    return list(Review.objects.filter(title_id=title_id).values_list(
+        'id', flat=True
+    )[:limit])
+
+
+def get_data(client, url):
+    response = client.get(url)
+    assert response.status_code == HTTPStatus.OK, (
+        f'Проверьте, что GET-запрос к `{url}` возвращает ответ со статусом '
+        '200.'
+    )
+    return response.json()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22TitleInclude:
+
+    def test_01_list_include_reviews(self, client, titles,
+                                     django_assert_num_queries):
+        url = '/api/v1/titles/?include=reviews&reviews_limit=2'
+        # COUNT, страница, жанры и отзывы всех произведений страницы.
+        with django_assert_num_queries(4):
+            data = get_data(client, url)
+        for title in data['results']:
+            assert [review['id'] for review in title['reviews']] == (
+                latest_review_ids(title['id'], 2)
+            ), (
+                'Проверьте, что `?include=reviews&reviews_limit=N` встраивает '
+                'в каждое произведение не более N последних отзывов.'
+            )
+        review = data['results'][0]['reviews'][0]
+        assert {'author', 'score', 'comment_count'} <= set(review)
+        assert 'reviews' not in get_data(client, '/api/v1/titles/')[
+            'results'
+        ][0], 'Без `?include=` отзывы не должны встраиваться.'
+
+    def test_02_retrieve_include_reviews(self, client, titles, settings):
+        data = get_data(
+            client, f'/api/v1/titles/{titles[0]}/?include=reviews'
+        )
+        assert [review['id'] for review in data['reviews']] == (
+            latest_review_ids(titles[0], settings.INCLUDE_LIMIT)
+        ), (
+            'Проверьте, что `?include=reviews` встраивает отзывы и в ответ '
+            'на запрос произведения.'
+        )
+        data = get_data(
+            client, f'/api/v1/titles/{titles[-1]}/?include=reviews'
+        )
+        assert data['reviews'] == []
+
+    def test_03_sparse_fields_with_include(self, client, titles):
+        data = get_data(
+            client, '/api/v1/titles/?fields=name&include=reviews'
+        )
+        assert set(data['results'][0]) == {'name', 'reviews'}
+
+    @pytest.mark.parametrize('limit', ('0', 'x', '1000'))
+    def test_04_invalid_limit(self, client, titles, limit):
+        url = f'/api/v1/titles/?include=reviews&reviews_limit={limit}'
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает ответ со '
+            'статусом 400.'
+        )
+
+    def test_05_cached_include_follows_comments(self, client, titles, user):
+        from reviews.models import Comment, Review
+
+        url = f'/api/v1/titles/{titles[0]}/?include=reviews'
+        get_data(client, url)
+        assert client.get(url)['X-Cache'] == 'HIT'
+        review = Review.objects.filter(title_id=titles[0]).first()
+        Comment.objects.create(review=review, author=user, text='Новый')
+        Review.objects.apply_comment_delta(review.id, 1)
+
+        response = client.get(url)
+        assert response['X-Cache'] == 'MISS', (
+            'Проверьте, что новый комментарий сбрасывает кэш ответов со '
+            'встроенными отзывами.'
+        )
+        assert response.json()['reviews'][0]['comment_count'] == 1
@@ -0,0 +1,96 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_reviews, create_single_review
+
+
+def expected_histogram(**counts):
+    histogram = {str(score): 0 for score in range(1, 11)}
+    histogram.update(counts)
+    return histogram
+
+
+def get_histogram(client, title_id):
+    url = f'/api/v1/titles/{title_id}/score-histogram/'
+    response = client.get(url)
+    assert response.status_code == HTTPStatus.OK, (
+        f'Проверьте, что GET-запрос к `{url}` возвращает ответ со статусом '
+        '200.'
+    )
+    return response.json()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23ScoreHistogram:
+
+    @pytest.mark.parametrize('upsert', (True, False))
+    def test_01_histogram_follows_reviews(self, client, admin_client, admin,
+                                          user_client, user, moderator_client,
+                                          moderator, upsert, monkeypatch):
+        if not upsert:
+            monkeypatch.setattr('reviews.models.UPSERT_VENDORS', ())
+        reviews, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        title_id = titles[0]['id']
+        create_single_review(moderator_client, title_id, 'Отзыв', 9)
+        assert get_histogram(client, title_id) == expected_histogram(
+            **{'5': 2, '9': 1}
+        ), (
+            'Проверьте, что гистограмма оценок считает отзывы с каждой '
+            'оценкой от 1 до 10.'
+        )
+
+        url = f'/api/v1/titles/{title_id}/reviews/{reviews[1]["id"]}/'
+        user_client.patch(url, data={'score': 9})
+        assert get_histogram(client, title_id) == expected_histogram(
+            **{'5': 1, '9': 2}
+        ), (
+            'Проверьте, что изменение оценки отзыва переносит его в '
+            'гистограмме.'
+        )
+
+        user_client.delete(url)
+        assert get_histogram(client, title_id) == expected_histogram(
+            **{'5': 1, '9': 1}
+        ), 'Проверьте, что удаление отзыва уменьшает счётчик его оценки.'
+
+    def test_02_single_query(self, client, admin_client, admin,
+                             django_assert_num_queries):
+        _, titles = create_reviews(admin_client, {admin: admin_client})
+        with django_assert_num_queries(1):
+            histogram = get_histogram(client, titles[0]['id'])
+        assert histogram == expected_histogram(**{'5': 1})
+
+    def test_03_empty_and_unknown_title(self, client, admin_client):
+        from reviews.models import Title
+
+        title = Title.objects.create(name='Без отзывов', year=2000)
+        assert get_histogram(client, title.id) == expected_histogram()
+        for pk in ('0', 'abc'):
+            response = client.get(f'/api/v1/titles/{pk}/score-histogram/')
+            assert response.status_code == HTTPStatus.NOT_FOUND, (
+                'Для несуществующего произведения гистограмма должна '
+                'отвечать 404, как и запрос произведения.'
+            )
+
+    def test_04_rebuild_command(self, client, admin_client, admin,
+                                user_client, user):
+        from reviews.models import ScoreHistogram
+
+        _, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        ScoreHistogram.objects.update(score_5=0, score_1=3)
+
+        call_command('rebuild_score_histograms', stdout=StringIO())
+
+        assert get_histogram(client, titles[0]['id']) == expected_histogram(
+            **{'5': 2}
+        ), (
+            'Проверьте, что команда `rebuild_score_histograms` пересобирает '
+            'гистограммы по таблице отзывов.'
+        )
@@ -0,0 +1,176 @@
+import threading
+from http import HTTPStatus
+
+import pytest
+from django.db import transaction
+
+from tests.utils import create_reviews
+
+
+class RecordingEffect:
+    """Действие, записывающее вызовы; первый вызов может ждать события."""
+
+    def __init__(self):
+        self.calls = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+
+    def merge(self, pending, data):
+        return pending + data
+
+    def run(self, key, data):
+        self.started.set()
+        self.release.wait(timeout=5)
+        self.calls.append((key, data, threading.current_thread().name))
+
+
+@pytest.fixture
+def async_pipeline(settings):
+    from api.pipeline import SideEffectPipeline
+
+    settings.SIDE_EFFECTS_SYNC = False
+    settings.SIDE_EFFECTS_WORKERS = 1
+    settings.SIDE_EFFECTS_RETRY_DELAY = 0
+    return SideEffectPipeline()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24SideEffects:
+
+    def test_01_coalesce_pending_events(self, async_pipeline):
+        effect = RecordingEffect()
+        effect.release.clear()
+        async_pipeline.dispatch(effect, 'a', 1)
+        assert effect.started.wait(timeout=5)
+        for _ in range(3):
+            async_pipeline.dispatch(effect, 'b', 1)
+        effect.release.set()
+        async_pipeline.flush()
+        assert [call[:2] for call in effect.calls] == [('a', 1), ('b', 3)], (
+            'Проверьте, что события с одним ключом, ждущие в очереди, '
+            'объединяются в одно действие.'
+        )
+        assert async_pipeline.stats['coalesced'] == 2
+        assert all(
+            call[2].startswith('side-effects-') for call in effect.calls
+        ), 'Действия должны выполняться в фоновых потоках.'
+
+    def test_02_full_queue_runs_inline(self, async_pipeline, settings):
+        settings.SIDE_EFFECTS_QUEUE_SIZE = 1
+        effect = RecordingEffect()
+        effect.release.clear()
+        async_pipeline.dispatch(effect, 'a', 1)
+        assert effect.started.wait(timeout=5)
+        async_pipeline.dispatch(effect, 'b', 1)
+        inline_effect = RecordingEffect()
+        async_pipeline.dispatch(inline_effect, 'c', 1)
+        effect.release.set()
+        async_pipeline.flush()
+        assert [call[0] for call in effect.calls] == ['a', 'b']
+        assert inline_effect.calls[0][2] == threading.current_thread().name, (
+            'Проверьте, что при заполненной очереди действие выполняется '
+            'в вызывающем потоке, а не теряется.'
+        )
+        assert async_pipeline.stats['inline'] == 1
+
+    def test_03_runs_after_commit_only(self):
+        from api.pipeline import SideEffectPipeline
+
+        sync_pipeline = SideEffectPipeline()
+        effect = RecordingEffect()
+        with transaction.atomic():
+            sync_pipeline.submit(effect, 'a', 1)
+            assert effect.calls == [], (
+                'Действие не должно выполняться до фиксации транзакции.'
+            )
+        assert [call[:2] for call in effect.calls] == [('a', 1)]
+
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                sync_pipeline.submit(effect, 'b', 1)
+                raise RuntimeError
+        assert [call[0] for call in effect.calls] == ['a'], (
+            'Действие отменённой транзакции не должно выполняться.'
+        )
+
+    def test_04_failed_effect_does_not_stop_workers(self, async_pipeline):
+        class FailingEffect(RecordingEffect):
+            def run(self, key, data):
+                self.calls.append(key)
+                raise ValueError
+
+        failing, effect = FailingEffect(), RecordingEffect()
+        async_pipeline.dispatch(failing, 'a', 1)
+        async_pipeline.dispatch(effect, 'b', 1)
+        async_pipeline.flush()
+        assert [call[:2] for call in effect.calls] == [('b', 1)]
+        assert async_pipeline.stats['failed'] == 1
+        assert failing.calls == ['a'], (
+            'Действие, упавшее не на откате транзакции, могло изменить '
+            'данные и не должно повторяться.'
+        )
+
+    def test_05_comment_counters_in_background(self, admin_client, admin,
+                                               settings):
+        from api.pipeline import pipeline
+        from reviews.models import Review
+
+        reviews, titles = create_reviews(admin_client, {admin: admin_client})
+        settings.SIDE_EFFECTS_SYNC = False
+        url = (
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}'
+            '/comments/'
+        )
+        for idx in range(3):
+            response = admin_client.post(url, data={'text': f'Текст {idx}'})
+            assert response.status_code == HTTPStatus.CREATED
+        pipeline.flush()
+        assert Review.objects.get(pk=reviews[0]['id']).comment_count == 3, (
+            'Проверьте, что счётчик комментариев обновляется фоновым '
+            'побочным действием.'
+        )
+
+    def test_06_failed_effect_retried_once(self, async_pipeline):
+        from django.db import OperationalError
+
+        from api.pipeline import atomic_effect
+
+        class FlakyEffect(RecordingEffect):
+            def run(self, key, data):
+                if not self.started.is_set():
+                    self.started.set()
+                    with atomic_effect():
+                        raise OperationalError('database table is locked')
+                super().run(key, data)
+
+        effect = FlakyEffect()
+        async_pipeline.dispatch(effect, 'a', 1)
+        async_pipeline.flush()
+        assert [call[:2] for call in effect.calls] == [('a', 1)], (
+            'Проверьте, что упавшее побочное действие повторяется.'
+        )
+        assert async_pipeline.stats['failed'] == 0
+
+    def test_07_cache_error_after_commit(self, async_pipeline, monkeypatch):
+        from api import cache
+        from api.effects import title_scores
+        from reviews.models import ScoreHistogram, Title
+
+        title = Title.objects.create(name='Произведение', year=2000)
+
+        def increment(*args, **kwargs):
+            raise ConnectionError
+
+        monkeypatch.setattr(cache, 'increment', increment)
+        async_pipeline.dispatch(title_scores, title.id, {
+            'score_sum': 7, 'review_count': 1, 'scores': {7: 1},
+        })
+        async_pipeline.flush()
+        title.refresh_from_db()
+        assert (title.score_sum, title.review_count) == (7, 1), (
+            'Проверьте, что ошибка кэша после фиксации транзакции не '
+            'приводит к повторному применению сдвига агрегатов.'
+        )
+        assert ScoreHistogram.objects.get(title=title).score_7 == 1
+        assert async_pipeline.stats['failed'] == 0
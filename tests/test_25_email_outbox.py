@@ -0,0 +1,135 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.utils import timezone
+
+
+def signup(client, username='outbox_user'):
+    return client.post('/api/v1/auth/signup/', data={
+        'username': username, 'email': f'{username}@yamdb.fake',
+    })
+
+
+@pytest.fixture
+def failing_mail(monkeypatch):
+    """Почтовый сервер, отклоняющий письма, пока failures не пуст."""
+    from reviews import outbox
+
+    failures = [OSError('SMTP недоступен')]
+    send_email = outbox.send_email
+
+    def send(email, connection):
+        if failures:
+            raise failures[0]
+        send_email(email, connection)
+
+    monkeypatch.setattr(outbox, 'send_email', send)
+    return failures
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25EmailOutbox:
+
+    def test_01_signup_enqueues_email(self, client, monkeypatch):
+        from api import effects
+        from reviews.models import OutboxEmail
+
+        # Фоновая отправка отключена: письмо отправит только команда.
+        monkeypatch.setattr(effects.outbox, 'run', lambda key, data: None)
+        response = signup(client)
+        assert response.status_code == HTTPStatus.OK
+        assert mail.outbox == [], (
+            'Проверьте, что регистрация не отправляет письмо в запросе.'
+        )
+        email = OutboxEmail.objects.get()
+        assert email.to == 'outbox_user@yamdb.fake'
+        assert email.sent_at is None
+
+        call_command('send_outbox', '--once')
+        assert len(mail.outbox) == 1, (
+            'Проверьте, что команда send_outbox отправляет письма из очереди.'
+        )
+        assert mail.outbox[0].to == ['outbox_user@yamdb.fake']
+        email.refresh_from_db()
+        assert email.sent_at is not None
+        call_command('send_outbox', '--once')
+        assert len(mail.outbox) == 1, 'Письмо не должно отправляться дважды.'
+
+    def test_02_failed_email_retried_with_backoff(self, client, settings,
+                                                  failing_mail):
+        from reviews.models import OutboxEmail
+        from reviews.outbox import drain_outbox
+
+        settings.OUTBOX_RETRY_DELAY = 10
+        settings.OUTBOX_MAX_RETRY_DELAY = 15
+        assert signup(client).status_code == HTTPStatus.OK, (
+            'Ошибка почтового сервера не должна ломать регистрацию.'
+        )
+        email = OutboxEmail.objects.get()
+        assert email.attempts == 1
+        assert email.last_error == 'SMTP недоступен'
+        delay = email.next_attempt_at - timezone.now()
+        assert timedelta(seconds=5) < delay <= timedelta(seconds=10)
+
+        assert drain_outbox() == (0, 0), (
+            'Проверьте, что письмо не отправляется до срока повтора.'
+        )
+        for attempts, max_delay in ((2, 15), (3, 15)):
+            OutboxEmail.objects.update(next_attempt_at=timezone.now())
+            assert drain_outbox() == (0, 1)
+            email.refresh_from_db()
+            delay = email.next_attempt_at - timezone.now()
+            assert email.attempts == attempts
+            assert timedelta(seconds=10) < delay <= timedelta(
+                seconds=max_delay
+            ), 'Пауза перед повтором должна расти до OUTBOX_MAX_RETRY_DELAY.'
+
+        failing_mail.clear()
+        OutboxEmail.objects.update(next_attempt_at=timezone.now())
+        assert drain_outbox() == (1, 0)
+        assert len(mail.outbox) == 1
+
+    def test_03_exhausted_email_not_retried(self, client, settings,
+                                            failing_mail):
+        from reviews.models import OutboxEmail
+        from reviews.outbox import drain_outbox
+
+        settings.OUTBOX_MAX_ATTEMPTS = 2
+        signup(client)
+        OutboxEmail.objects.update(next_attempt_at=timezone.now())
+        assert drain_outbox() == (0, 1)
+        email = OutboxEmail.objects.get()
+        assert email.attempts == 2
+        assert email.next_attempt_at is None, (
+            'Проверьте, что после OUTBOX_MAX_ATTEMPTS попыток письмо '
+            'больше не отправляется.'
+        )
+        failing_mail.clear()
+        assert drain_outbox() == (0, 0)
+        assert mail.outbox == []
+
+    def test_04_claimed_email_leased(self, settings):
+        from reviews.models import OutboxEmail
+        from reviews.outbox import claim_batch, enqueue_email
+
+        for number in range(3):
+            enqueue_email('subject', 'body', f'user{number}@yamdb.fake')
+        first = claim_batch(2)
+        assert len(first) == 2
+        second = claim_batch(10)
+        assert [email.pk for email in second] == [
+            email.pk for email in OutboxEmail.objects.exclude(
+                pk__in=[email.pk for email in first]
+            )
+        ], 'Захваченные письма не должны достаться другому обработчику.'
+        assert claim_batch(10) == []
+        lease_end = timezone.now() + timedelta(
+            seconds=settings.OUTBOX_LEASE + 1
+        )
+        assert len(claim_batch(10, now=lease_end)) == 3, (
+            'Проверьте, что письма возвращаются в очередь после '
+            'истечения аренды.'
+        )
@@ -0,0 +1,88 @@
+import pytest
+from django.core import mail
+from django.core.management import call_command
+
+
+@pytest.fixture
+def connections(monkeypatch):
+    """Соединения с почтовым сервером, открытые при отправке очереди."""
+    from reviews import outbox
+
+    opened = []
+    get_connection = outbox.get_connection
+
+    def connect(*args, **kwargs):
+        connection = get_connection(*args, **kwargs)
+        opened.append(connection)
+        return connection
+
+    monkeypatch.setattr(outbox, 'get_connection', connect)
+    return opened
+
+
+def enqueue(count):
+    from reviews.outbox import enqueue_email
+
+    for number in range(count):
+        enqueue_email('subject', f'body {number}', f'user{number}@yamdb.fake')
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26OutboxDispatcher:
+
+    def test_01_batch_reuses_connection(self, connections):
+        from reviews.models import OutboxEmail
+        from reviews.outbox import OutboxDispatcher
+
+        enqueue(5)
+        dispatcher = OutboxDispatcher(batch_size=2)
+        assert dispatcher.drain() == (5, 0)
+        assert len(mail.outbox) == 5
+        assert len(connections) == 3, (
+            'Проверьте, что каждая пачка писем отправляется через одно '
+            'соединение с почтовым сервером.'
+        )
+        assert all(
+            message.connection is connection
+            for message, connection in zip(
+                mail.outbox, [connections[0]] * 2 + [connections[1]] * 2
+            )
+        )
+        assert not OutboxEmail.objects.filter(sent_at__isnull=True).exists()
+        stats = dispatcher.get_stats()
+        assert stats['sent'] == 5
+        assert stats['batches'] == 3
+        assert stats['rate'] > 0, (
+            'Проверьте, что обработчик считает число писем в секунду.'
+        )
+
+    def test_02_connection_failure_retried(self, monkeypatch):
+        from reviews import outbox
+        from reviews.models import OutboxEmail
+
+        def refuse(*args, **kwargs):
+            raise ConnectionRefusedError('Сервер недоступен')
+
+        monkeypatch.setattr(outbox, 'get_connection', refuse)
+        enqueue(3)
+        assert outbox.OutboxDispatcher().drain() == (0, 3)
+        assert set(OutboxEmail.objects.values_list('attempts', flat=True)) == {
+            1
+        }, 'Письма пачки без соединения должны ждать повтора.'
+
+    def test_03_file_backend(self, settings, tmp_path):
+        settings.EMAIL_BACKEND = (
+            'django.core.mail.backends.filebased.EmailBackend'
+        )
+        settings.EMAIL_FILE_PATH = tmp_path
+        enqueue(3)
+        call_command('send_outbox', '--once', '--batch-size', '3')
+        files = list(tmp_path.iterdir())
+        assert len(files) == 1, (
+            'Файловый бэкенд пишет пачку, отправленную через одно '
+            'соединение, в один файл.'
+        )
+        content = files[0].read_text()
+        assert all(
+            f'user{number}@yamdb.fake' in content for number in range(3)
+        )
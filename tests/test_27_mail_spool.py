@@ -0,0 +1,95 @@
+import os
+import time
+
+import pytest
+from django.core.mail import EmailMessage, get_connection
+from django.core.management import call_command
+
+
+@pytest.fixture
+def spool_settings(settings, tmp_path):
+    settings.EMAIL_BACKEND = 'reviews.spool.SpoolEmailBackend'
+    settings.EMAIL_SPOOL_PATH = tmp_path
+    settings.EMAIL_SPOOL_SEGMENT_SIZE = 2048
+    return settings
+
+
+def send(*recipients, body='Your confirmation code: 1'):
+    connection = get_connection()
+    return connection.send_messages([
+        EmailMessage('YaMDb registration', body, 'admin@yamdb.ru', [to])
+        for to in recipients
+    ])
+
+
+class Test27MailSpool:
+
+    def test_01_segments_rotated(self, spool_settings, tmp_path):
+        from reviews.spool import MailSpool
+
+        recipients = [f'user{number}@yamdb.fake' for number in range(20)]
+        assert send(*recipients) == 20
+        segments = sorted(tmp_path.glob('segment-*.log'))
+        assert 1 < len(segments) < 20, (
+            'Проверьте, что письма дописываются в сегменты, а сегмент '
+            'сменяется по достижении EMAIL_SPOOL_SEGMENT_SIZE.'
+        )
+        assert all(
+            path.stat().st_size <= 2048 for path in segments[:-1]
+        )
+        spool = MailSpool()
+        for recipient in recipients:
+            message, = spool.lookup(recipient)
+            assert message['To'] == recipient
+        assert spool.lookup('nobody@yamdb.fake') == []
+
+    def test_02_lookup_latest(self, spool_settings):
+        from reviews.spool import MailSpool
+
+        send('user@yamdb.fake', body='Your confirmation code: 1')
+        send('other@yamdb.fake')
+        send('User@yamdb.fake', body='Your confirmation code: 2')
+        spool = MailSpool()
+        message, = spool.lookup('user@yamdb.fake')
+        assert message.get_payload() == 'Your confirmation code: 2', (
+            'Проверьте, что поиск возвращает последнее письмо получателю.'
+        )
+        assert [
+            message.get_payload()
+            for message in spool.lookup('user@yamdb.fake', latest=False)
+        ] == ['Your confirmation code: 1', 'Your confirmation code: 2']
+
+    def test_03_compaction(self, spool_settings, tmp_path):
+        from reviews.spool import MailSpool
+
+        spool = MailSpool()
+        send(*(f'old{number}@yamdb.fake' for number in range(5)))
+        send(*(f'user{number}@yamdb.fake' for number in range(5)))
+        send(*(f'user{number}@yamdb.fake' for number in range(5)))
+        segments = spool.get_segments()
+        assert len(segments) >= 3
+        expired = time.time() - 31 * 24 * 60 * 60
+        os.utime(spool.get_segment_path(segments[0]), (expired, expired))
+
+        removed = spool.compact()
+        assert segments[0] in removed, (
+            'Проверьте, что очистка удаляет сегменты старше '
+            'EMAIL_SPOOL_RETENTION дней.'
+        )
+        assert segments[-1] not in removed
+        assert spool.lookup('old0@yamdb.fake') == []
+        for number in range(5):
+            message, = spool.lookup(f'user{number}@yamdb.fake')
+            assert message['To'] == f'user{number}@yamdb.fake'
+        assert all(entry[1] in spool.get_segments()
+                   for entry in spool.read_index()), (
+            'Индекс не должен ссылаться на удалённые сегменты.'
+        )
+        assert len(list(spool.read_index())) < 15
+
+    def test_04_commands(self, spool_settings, capsys):
+        send('user@yamdb.fake', body='Your confirmation code: 42')
+        call_command('read_mail_spool', 'user@yamdb.fake')
+        assert 'Your confirmation code: 42' in capsys.readouterr().out
+        call_command('compact_mail_spool')
+        assert 'Удалено сегментов спула: 0' in capsys.readouterr().out
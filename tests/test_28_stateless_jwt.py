@@ -0,0 +1,136 @@
+import importlib.util
+from http import HTTPStatus
+
+import pytest
+from django.conf import settings
+from django.contrib.auth.tokens import default_token_generator
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+
+def get_client(user):
+    response = APIClient().post('/api/v1/auth/token/', data={
+        'username': user.username,
+        'confirmation_code': default_token_generator.make_token(user),
+    })
+    assert response.status_code == HTTPStatus.OK
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {response.data["token"]}')
+    return client, AccessToken(response.data['token'])
+
+
+def load_users_csv():
+    """Загружает users.csv скриптом static/data/data_load.py."""
+    path = settings.BASE_DIR / 'static' / 'data'
+    spec = importlib.util.spec_from_file_location(
+        'data_load', path / 'data_load.py'
+    )
+    data_load = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(data_load)
+    connection.ensure_connection()
+    data_load.conn = connection.connection
+    data_load.data_save(
+        'reviews_customuser', data_load.load_csv(path / 'users.csv')
+    )
+
+
+def get_user_queries(context):
+    return [
+        query['sql'] for query in context.captured_queries
+        if 'FROM "reviews_customuser"' in query['sql']
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test28StatelessJWT:
+
+    def test_01_token_claims(self, admin):
+        _, token = get_client(admin)
+        assert token['username'] == admin.username
+        assert token['role'] == 'admin'
+        assert token['is_staff'] is False
+        assert token['token_version'] == admin.token_version
+
+    def test_02_permissions_without_user_query(self, admin):
+        client, _ = get_client(admin)
+        client.get('/api/v1/users/')
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(
+                '/api/v1/categories/', data={'name': 'Фильм', 'slug': 'film'}
+            )
+        assert response.status_code == HTTPStatus.CREATED
+        assert get_user_queries(context) == [], (
+            'Проверьте, что для проверки разрешений пользователь '
+            'не читается из базы, а собирается из токена.'
+        )
+
+    def test_03_review_author_from_token(self, user, admin_client):
+        client, _ = get_client(user)
+        client.get('/api/v1/categories/')
+        category = admin_client.post(
+            '/api/v1/categories/', data={'name': 'Фильм', 'slug': 'film'}
+        )
+        title = admin_client.post('/api/v1/titles/', data={
+            'name': 'Поезд', 'year': 1896, 'category': 'film', 'genre': [],
+        })
+        assert category.status_code == title.status_code == HTTPStatus.CREATED
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(
+                f'/api/v1/titles/{title.data["id"]}/reviews/',
+                data={'text': 'Отзыв', 'score': 7},
+            )
+        assert response.status_code == HTTPStatus.CREATED
+        assert response.data['author'] == user.username
+        assert get_user_queries(context) == []
+
+    def test_04_me_reads_full_profile(self, user):
+        client, _ = get_client(user)
+        response = client.get('/api/v1/users/me/')
+        assert response.status_code == HTTPStatus.OK
+        assert response.data['email'] == user.email
+        assert response.data['bio'] == 'user bio', (
+            'Проверьте, что /users/me/ отдаёт профиль, прочитанный из базы.'
+        )
+
+    def test_05_role_change_revokes_token(self, user, admin_client):
+        client, _ = get_client(user)
+        assert client.get('/api/v1/users/me/').status_code == HTTPStatus.OK
+        response = admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'role': 'admin'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert client.get('/api/v1/users/me/').status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), 'Проверьте, что смена роли отзывает выданные токены.'
+
+        user.refresh_from_db()
+        client, token = get_client(user)
+        assert token['role'] == 'admin'
+        assert client.get('/api/v1/users/').status_code == HTTPStatus.OK
+
+    def test_06_profile_change_keeps_token(self, user):
+        client, _ = get_client(user)
+        response = client.patch('/api/v1/users/me/', data={'bio': 'new bio'})
+        assert response.status_code == HTTPStatus.OK
+        assert client.get('/api/v1/users/me/').data['bio'] == 'new bio', (
+            'Изменение полей, которых нет в токене, не должно его отзывать.'
+        )
+
+    def test_07_role_change_of_loaded_user(self, admin_client,
+                                           django_user_model):
+        load_users_csv()
+        user = django_user_model.objects.get(username='bingobongo')
+        assert user.token_version == 0, (
+            'Проверьте, что data_load.py записывает версию токенов 0.'
+        )
+        client, token = get_client(user)
+        assert token['token_version'] == 0
+        response = admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'role': 'moderator'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert client.get('/api/v1/users/me/').status_code == (
+            HTTPStatus.UNAUTHORIZED
+        )
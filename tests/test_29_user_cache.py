@@ -0,0 +1,94 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def get_user_queries(context):
+    return [
+        query['sql'] for query in context.captured_queries
+        if 'FROM "reviews_customuser"' in query['sql']
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test29UserCache:
+
+    def test_01_cached_user(self, user_client, admin_client):
+        assert user_client.get('/api/v1/categories/').status_code == (
+            HTTPStatus.OK
+        )
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.get('/api/v1/users/me/')
+        assert response.status_code == HTTPStatus.OK
+        assert len(get_user_queries(context)) == 1, (
+            'Проверьте, что аутентификация берёт пользователя из кэша: '
+            'из базы читается только профиль /users/me/.'
+        )
+        response = admin_client.get('/api/v1/user-cache-stats/')
+        assert response.status_code == HTTPStatus.OK
+        assert response.data['hits'] == 1
+        # Промахи: первый запрос пользователя и запрос администратора.
+        assert response.data['misses'] == 2
+        assert response.data['hit_ratio'] == pytest.approx(1 / 3)
+        assert user_client.get('/api/v1/user-cache-stats/').status_code == (
+            HTTPStatus.FORBIDDEN
+        )
+
+    def test_02_role_change_invalidates(self, user, user_client,
+                                        admin_client):
+        assert user_client.get('/api/v1/users/').status_code == (
+            HTTPStatus.FORBIDDEN
+        )
+        response = admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'role': 'admin'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert user_client.get('/api/v1/users/').status_code == (
+            HTTPStatus.OK
+        ), 'Проверьте, что смена роли сбрасывает пользователя в кэше.'
+
+    def test_03_profile_change_invalidates(self, user, user_client):
+        from api.authentication import user_cache
+
+        user_client.get('/api/v1/categories/')
+        assert user.pk in user_cache.users
+        response = user_client.patch('/api/v1/users/me/', data={'bio': 'new'})
+        assert response.status_code == HTTPStatus.OK
+        assert user.pk not in user_cache.users, (
+            'Проверьте, что изменение профиля сбрасывает пользователя в кэше.'
+        )
+
+    def test_04_delete_invalidates(self, user, user_client, admin_client):
+        user_client.get('/api/v1/categories/')
+        response = admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert user_client.get('/api/v1/users/me/').status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), 'Удалённый пользователь не должен браться из кэша.'
+
+    def test_05_size_and_timeout(self, settings, user, admin):
+        from api.authentication import user_cache
+
+        settings.USER_CACHE_SIZE = 1
+        user_cache.set(user)
+        user_cache.set(admin)
+        assert user_cache.get(user.pk) is None
+        assert user_cache.get(admin.pk) == admin
+        assert user_cache.get_stats()['evictions'] == 1, (
+            'Проверьте, что кэш вытесняет давно не использованные записи.'
+        )
+        settings.USER_CACHE_TIMEOUT = 0
+        user_cache.set(user)
+        assert user_cache.get(user.pk) is None, (
+            'Проверьте, что записи кэша устаревают через USER_CACHE_TIMEOUT.'
+        )
+
+    def test_06_cached_user_not_shared(self, user):
+        from api.authentication import user_cache
+
+        user_cache.set(user)
+        cached = user_cache.get(user.pk)
+        cached.bio = 'changed'
+        assert user_cache.get(user.pk).bio == 'user bio'